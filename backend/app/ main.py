@@ -4,11 +4,20 @@ from contextlib import asynccontextmanager
 from loguru import logger
 import sys
 import json
+import asyncio
 
 from config import settings
-from database import init_db
+from database import init_db, async_engine
 from api.routes import router
 from services.mt5_service import mt5_service
+from services.price_stream import PriceStreamHub
+from services.connection_manager import ConnectionManager
+from services.compact_codec import CompactPriceEncoder
+from services.signal_engine import signal_engine
+from services.scanner import market_scanner
+from services.strategy_transfer import strategy_transfer
+from services.tick_board import TickBoardClient
+from services.replay import ReplayManager
 
 # Configure logging
 logger.remove()
@@ -31,19 +40,41 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Database initialization failed: {e}")
     
-    # Connect to MT5
-    if mt5_service.connect():
-        logger.info("Connected to MT5")
-        account_info = mt5_service.get_account_info()
-        logger.info(f"Account: {account_info['login']}, Balance: {account_info['balance']}")
+    # With the tick board, the publisher process owns the terminal connection
+    if settings.TICK_BOARD_ENABLED:
+        await price_hub.attach_tick_board(TickBoardClient(price_hub.on_board_tick))
+        logger.info("Live ticks served from the shared tick board")
     else:
-        logger.warning("MT5 connection failed - some features will be unavailable")
+        # Connect to MT5
+        if mt5_service.connect():
+            logger.info("Connected to MT5")
+            account_info = mt5_service.get_account_info()
+            logger.info(f"Account: {account_info['login']}, Balance: {account_info['balance']}")
+        else:
+            logger.warning("MT5 connection failed - retrying in background, some features will be unavailable")
+        
+        # Keep the connection healthy in the background
+        mt5_service.start_supervisor()
+    
+    # Index active strategies for live signal evaluation
+    try:
+        await asyncio.to_thread(signal_engine.load_active_strategies)
+    except Exception as e:
+        logger.error(f"Loading strategies for live signals failed: {e}")
+    signal_engine.start(price_hub, manager)
     
     yield
     
     # Shutdown
     logger.info("Shutting down...")
+    signal_engine.stop()
+    await replay_manager.shutdown()
+    await price_hub.shutdown()
+    market_scanner.shutdown()
+    strategy_transfer.shutdown()
+    mt5_service.stop_supervisor()
     mt5_service.disconnect()
+    await async_engine.dispose()
     logger.info("Shutdown complete")
 
 # Create FastAPI app
@@ -60,48 +91,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include routers
 app.include_router(router, prefix="/api")
 
 # WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
-    
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"WebSocket connected. Total: {len(self.active_connections)}")
-    
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-        logger.info(f"WebSocket disconnected. Total: {len(self.active_connections)}")
-    
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except:
-                pass
-
 manager = ConnectionManager()
+price_hub = PriceStreamHub(manager)
+replay_manager = ReplayManager(manager)
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for real-time data streaming
-    Sends live price updates and account info
+    Sends live price updates, live bars, strategy signals, historical replays and account info
     """
     await manager.connect(websocket)
     
     try:
         # Send initial connection success
-        await websocket.send_json({
+        await manager.send_personal_message({
             "type": "connected",
             "message": "WebSocket connected successfully"
-        })
+        }, websocket)
         
         while True:
             # Receive message from client
@@ -111,30 +125,76 @@ async def websocket_endpoint(websocket: WebSocket):
             # Handle different message types
             if message.get('type') == 'subscribe_symbol':
                 symbol = message.get('symbol')
-                
-                # Send current price
-                price_data = mt5_service.get_current_price(symbol)
-                if price_data:
-                    await websocket.send_json({
-                        "type": "price_update",
-                        "data": price_data
-                    })
+                if symbol:
+                    # Price updates are pushed until unsubscribed, at most max_rate per second
+                    await price_hub.subscribe(websocket, symbol, message.get('max_rate'))
+            
+            elif message.get('type') == 'unsubscribe_symbol':
+                symbol = message.get('symbol')
+                if symbol:
+                    await price_hub.unsubscribe(websocket, symbol)
+            
+            elif message.get('type') == 'subscribe_bars':
+                # Live candles: bar_update for the forming bar, bar_closed on rollover
+                symbol = message.get('symbol')
+                timeframes = message.get('timeframes') or [message.get('timeframe', 'M1')]
+                if symbol:
+                    await price_hub.subscribe_bars(websocket, symbol, timeframes)
+            
+            elif message.get('type') == 'unsubscribe_bars':
+                symbol = message.get('symbol')
+                if symbol:
+                    await price_hub.unsubscribe_bars(websocket, symbol)
+            
+            elif message.get('type') == 'replay_start':
+                # Historical bars at an accelerated pace, optionally with strategy signals overlaid
+                await replay_manager.start(websocket, message)
+            
+            elif message.get('type') == 'replay_pause':
+                await replay_manager.pause(websocket, message)
+            
+            elif message.get('type') == 'replay_resume':
+                await replay_manager.resume(websocket, message)
+            
+            elif message.get('type') == 'replay_seek':
+                await replay_manager.seek(websocket, message)
+            
+            elif message.get('type') == 'replay_speed':
+                await replay_manager.set_speed(websocket, message)
+            
+            elif message.get('type') == 'replay_stop':
+                await replay_manager.stop(websocket, message)
+            
+            elif message.get('type') == 'set_format':
+                # Opt into compact delta-encoded price frames ("compact") or back to "json"
+                fmt = message.get('format', 'json')
+                try:
+                    encoder = CompactPriceEncoder(message.get('encoding', 'json')) if fmt == 'compact' else None
+                except ValueError as e:
+                    await manager.send_personal_message({"type": "error", "message": str(e)}, websocket)
+                    continue
+                manager.set_encoder(websocket, encoder)
+                await manager.send_personal_message({"type": "format", "format": fmt}, websocket)
             
             elif message.get('type') == 'get_account':
                 account_info = mt5_service.get_account_info()
                 if account_info:
-                    await websocket.send_json({
+                    await manager.send_personal_message({
                         "type": "account_update",
                         "data": account_info
-                    })
+                    }, websocket)
             
             elif message.get('type') == 'ping':
-                await websocket.send_json({"type": "pong"})
+                await manager.send_personal_message({"type": "pong"}, websocket)
                 
     except WebSocketDisconnect:
+        await replay_manager.stop_all(websocket)
+        await price_hub.unsubscribe_all(websocket)
         manager.disconnect(websocket)
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+        await replay_manager.stop_all(websocket)
+        await price_hub.unsubscribe_all(websocket)
         manager.disconnect(websocket)
 
 @app.get("/")
@@ -156,6 +216,7 @@ async def health_check():
     return {
         "status": "healthy",
         "mt5_status": mt5_status,
+        "mt5_connection": mt5_service.get_connection_state(),
         "account": account_info
     }
 
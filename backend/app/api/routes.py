@@ -1,17 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func, literal_column
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import datetime, timedelta
-from pydantic import BaseModel
+from datetime import datetime, timedelta, timezone
+from pydantic import BaseModel, field_validator
 import json
 
-from database import get_db, Strategy, Backtest, MarketData
-from services.mt5_service import mt5_service
+from database import get_async_db, Strategy, StrategyRevision, StrategyStats, Backtest, MarketData
+from services.mt5_service import mt5_service, TIMEFRAME_SECONDS
 from services.mql5_generator import MQL5Generator
 from services.backtest_engine import BacktestEngine
+from services.columnar import wants_columnar, columnar_response, frame_to_columns, records_to_columns
+from services.downsampling import downsample_ohlc
+from services.signal_engine import signal_engine
+from services.scanner import market_scanner
+from services.series_codec import encode_series, SeriesBlob
+from services.pagination import keyset_page, split_page, NEXT_CURSOR_HEADER
+from services.revision_store import revision_store
+from services.strategy_stats import strategy_stats
+from services.strategy_transfer import strategy_transfer
 
 router = APIRouter()
 
+# Heavy backtest columns returned by GET /backtests/{id} only on request
+BACKTEST_INCLUDES = {"trades", "equity"}
+
+# Page size bounds for list endpoints
+MAX_PAGE_SIZE = 500
+
+# Leaderboard rankings: metric -> best first is highest (each has an index on strategy_stats)
+LEADERBOARD_METRICS = {
+    "avg_profit_factor": True,
+    "avg_win_rate": True,
+    "avg_sharpe_ratio": True,
+    "avg_max_drawdown": False,
+    "best_net_profit": True,
+    "latest_profit_factor": True
+}
+
 # ==================== REQUEST/RESPONSE MODELS ====================
 
 class StrategyCreate(BaseModel):
@@ -24,6 +53,9 @@ class StrategyCreate(BaseModel):
     exit_rules: dict = {}
     risk_management: dict = {}
 
+class StrategyImport(StrategyCreate):
+    version: int = 1
+
 class StrategyUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
@@ -31,6 +63,7 @@ class StrategyUpdate(BaseModel):
     entry_rules: Optional[dict] = None
     exit_rules: Optional[dict] = None
     risk_management: Optional[dict] = None
+    commit_message: Optional[str] = None
 
 class BacktestRequest(BaseModel):
     strategy_id: str
@@ -38,18 +71,24 @@ class BacktestRequest(BaseModel):
     end_date: datetime
     initial_balance: float = 10000.0
 
+    @field_validator('start_date', 'end_date')
+    @classmethod
+    def naive_utc(cls, value: datetime) -> datetime:
+        # Browsers send toISOString() (UTC, "Z"); the terminal and the
+        # TIMESTAMP columns work with naive datetimes
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
 # ==================== MT5 ENDPOINTS ====================
 
 @router.get("/mt5/status")
 async def get_mt5_status():
-    """Get MT5 connection status"""
-    if mt5_service.connect():
-        account_info = mt5_service.get_account_info()
-        return {
-            "connected": True,
-            "account": account_info
-        }
-    return {"connected": False}
+    """Get MT5 connection status (never blocks on a reconnect attempt)"""
+    state = mt5_service.get_connection_state()
+    if state["connected"]:
+        state["account"] = mt5_service.get_account_info()
+    return state
 
 @router.get("/mt5/symbols")
 async def get_symbols():
@@ -67,26 +106,52 @@ async def get_symbol_info(symbol: str):
 
 @router.get("/mt5/historical-data")
 async def get_historical_data(
+    request: Request,
     symbol: str,
     timeframe: str,
-    days: int = 30
+    days: int = 30,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: Optional[int] = None,
+    width: Optional[int] = None
 ):
-    """Fetch historical market data"""
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
+    """
+    Fetch historical market data
+    Send `Accept: application/x-msgpack` to receive typed columns instead of JSON rows
+    
+    Pass `max_points` (or the chart's pixel `width`) to get OHLC buckets that keep
+    each bucket's true high/low. To load more detail when zooming in, request the
+    visible `start`/`end` sub-range with the same target.
+    """
+    end_date = end or datetime.now()
+    start_date = start or end_date - timedelta(days=days)
     
     data = mt5_service.get_historical_data(symbol, timeframe, start_date, end_date)
     
     if data is None:
         raise HTTPException(status_code=500, detail="Failed to fetch data from MT5")
     
-    return {
+    response = {
         "symbol": symbol,
         "timeframe": timeframe,
         "start_date": start_date.isoformat(),
-        "end_date": end_date.isoformat(),
-        "data": data.to_dict('records')
+        "end_date": end_date.isoformat()
     }
+    
+    target_points = max_points or width
+    if target_points:
+        bar_seconds = TIMEFRAME_SECONDS.get(timeframe.upper(), TIMEFRAME_SECONDS["H1"])
+        source_bars = len(data)
+        data, bucket_seconds = downsample_ohlc(data, target_points, bar_seconds)
+        response["source_bars"] = source_bars
+        response["bucket_seconds"] = bucket_seconds
+    
+    if wants_columnar(request):
+        response["data"] = frame_to_columns(data)
+        return columnar_response(response)
+    
+    response["data"] = data.to_dict('records')
+    return response
 
 @router.get("/mt5/current-price/{symbol}")
 async def get_current_price(symbol: str):
@@ -99,7 +164,7 @@ async def get_current_price(symbol: str):
 # ==================== STRATEGY ENDPOINTS ====================
 
 @router.post("/strategies")
-async def create_strategy(strategy: StrategyCreate, db: Session = Depends(get_db)):
+async def create_strategy(strategy: StrategyCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new strategy"""
     db_strategy = Strategy(
         name=strategy.name,
@@ -120,9 +185,16 @@ async def create_strategy(strategy: StrategyCreate, db: Session = Depends(get_db
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Code generation failed: {str(e)}")
     
+    db_strategy.version = 1
     db.add(db_strategy)
-    db.commit()
-    db.refresh(db_strategy)
+    await db.flush()
+    await revision_store.record(db, db_strategy, "Initial version")
+    await db.commit()
+    await db.refresh(db_strategy)
+    
+    signal_engine.upsert_strategy(
+        str(db_strategy.id), db_strategy.symbol, db_strategy.timeframe, db_strategy.visual_elements
+    )
     
     return {
         "id": str(db_strategy.id),
@@ -132,12 +204,44 @@ async def create_strategy(strategy: StrategyCreate, db: Session = Depends(get_db
 
 @router.get("/strategies")
 async def list_strategies(
-    skip: int = 0,
+    response: Response,
+    cursor: Optional[str] = None,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    skip: int = 0,
+    symbol: Optional[str] = None,
+    timeframe: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List all strategies"""
-    strategies = db.query(Strategy).filter(Strategy.is_active == True).offset(skip).limit(limit).all()
+    """
+    List strategies, most recently updated first
+    
+    When more rows exist the `X-Next-Cursor` response header holds the value to
+    pass as `cursor` for the next page. `skip` is still honoured for older
+    clients but, unlike the cursor, gets slower the deeper it goes.
+    """
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    
+    query = select(
+        Strategy.id, Strategy.name, Strategy.description, Strategy.symbol,
+        Strategy.timeframe, Strategy.version, Strategy.created_at, Strategy.updated_at
+    ).where(Strategy.is_active == True)
+    if symbol:
+        query = query.where(Strategy.symbol == symbol)
+    if timeframe:
+        query = query.where(Strategy.timeframe == timeframe.upper())
+    
+    try:
+        query = keyset_page(query, Strategy.updated_at, Strategy.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if skip and not cursor:
+        query = query.offset(skip)
+    
+    strategies, next_cursor = split_page((await db.execute(query)).all(), limit, "updated_at")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    
     return [
         {
             "id": str(s.id),
@@ -152,10 +256,30 @@ async def list_strategies(
         for s in strategies
     ]
 
+@router.post("/strategies/import")
+async def import_strategies(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Bulk import strategies from an NDJSON body, one definition per line
+    
+    Lines use the POST /strategies fields plus an optional version. Invalid
+    lines and names that already exist are reported and skipped; the rest
+    are committed in batches.
+    """
+    return await strategy_transfer.import_stream(db, request.stream(), StrategyImport)
+
+@router.get("/strategies/export")
+async def export_strategies(symbol: Optional[str] = None, timeframe: Optional[str] = None):
+    """Stream active strategies as NDJSON in the import format"""
+    return StreamingResponse(
+        strategy_transfer.export_stream(symbol, timeframe),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=strategies.ndjson"}
+    )
+
 @router.get("/strategies/{strategy_id}")
-async def get_strategy(strategy_id: str, db: Session = Depends(get_db)):
+async def get_strategy(strategy_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get strategy details"""
-    strategy = db.query(Strategy).filter(Strategy.id == strategy_id).first()
+    strategy = await db.scalar(select(Strategy).where(Strategy.id == strategy_id))
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
     
@@ -178,15 +302,17 @@ async def get_strategy(strategy_id: str, db: Session = Depends(get_db)):
 async def update_strategy(
     strategy_id: str,
     updates: StrategyUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update strategy"""
-    strategy = db.query(Strategy).filter(Strategy.id == strategy_id).first()
+    # Lock the row so concurrent saves take consecutive versions
+    strategy = await db.scalar(select(Strategy).where(Strategy.id == strategy_id).with_for_update())
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
     
     # Update fields
     update_data = updates.dict(exclude_unset=True)
+    commit_message = update_data.pop("commit_message", None)
     for field, value in update_data.items():
         setattr(strategy, field, value)
     
@@ -207,27 +333,39 @@ async def update_strategy(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Code generation failed: {str(e)}")
     
-    db.commit()
-    db.refresh(strategy)
+    # Every save is a new version; its revision commits with it
+    strategy.version = (strategy.version or 0) + 1
+    try:
+        await revision_store.record(db, strategy, commit_message)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Strategy was changed concurrently or conflicts with an existing strategy version")
+    await db.refresh(strategy)
+    
+    if strategy.is_active:
+        signal_engine.upsert_strategy(str(strategy.id), strategy.symbol, strategy.timeframe, strategy.visual_elements)
     
-    return {"message": "Strategy updated", "mql5_code": strategy.mql5_code}
+    return {"message": "Strategy updated", "version": strategy.version, "mql5_code": strategy.mql5_code}
 
 @router.delete("/strategies/{strategy_id}")
-async def delete_strategy(strategy_id: str, db: Session = Depends(get_db)):
+async def delete_strategy(strategy_id: str, db: AsyncSession = Depends(get_async_db)):
     """Delete strategy (soft delete)"""
-    strategy = db.query(Strategy).filter(Strategy.id == strategy_id).first()
+    strategy = await db.scalar(select(Strategy).where(Strategy.id == strategy_id))
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
     
     strategy.is_active = False
-    db.commit()
+    await strategy_stats.set_active(db, strategy.id, False)
+    await db.commit()
+    signal_engine.remove_strategy(str(strategy.id))
     
     return {"message": "Strategy deleted"}
 
 @router.get("/strategies/{strategy_id}/code")
-async def get_strategy_code(strategy_id: str, db: Session = Depends(get_db)):
+async def get_strategy_code(strategy_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get generated MQL5 code"""
-    strategy = db.query(Strategy).filter(Strategy.id == strategy_id).first()
+    strategy = await db.scalar(select(Strategy).where(Strategy.id == strategy_id))
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
     
@@ -237,13 +375,115 @@ async def get_strategy_code(strategy_id: str, db: Session = Depends(get_db)):
         "mql5_code": strategy.mql5_code
     }
 
+@router.get("/strategies/{strategy_id}/revisions")
+async def list_strategy_revisions(strategy_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Version history of a strategy, newest first (metadata only)"""
+    revisions = (await db.execute(
+        select(
+            StrategyRevision.version, StrategyRevision.commit_message, StrategyRevision.created_at,
+            StrategyRevision.snapshot_hash, StrategyRevision.code_hash
+        )
+        .where(StrategyRevision.strategy_id == strategy_id)
+        .order_by(StrategyRevision.version.desc())
+    )).all()
+    if not revisions and not await db.scalar(select(Strategy.id).where(Strategy.id == strategy_id)):
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    
+    return [
+        {
+            "version": r.version,
+            "commit_message": r.commit_message,
+            "created_at": r.created_at.isoformat(),
+            "snapshot_hash": r.snapshot_hash,
+            "code_hash": r.code_hash
+        }
+        for r in revisions
+    ]
+
+async def _get_revision(db: AsyncSession, strategy_id: str, version: int) -> StrategyRevision:
+    revision = await db.scalar(
+        select(StrategyRevision)
+        .where(StrategyRevision.strategy_id == strategy_id, StrategyRevision.version == version)
+    )
+    if not revision or not revision.snapshot_hash:
+        raise HTTPException(status_code=404, detail=f"Revision {version} not found")
+    return revision
+
+@router.get("/strategies/{strategy_id}/revisions/{version}")
+async def get_strategy_revision(strategy_id: str, version: int, db: AsyncSession = Depends(get_async_db)):
+    """Strategy definition and MQL5 code as of a version"""
+    revision = await _get_revision(db, strategy_id, version)
+    return {"strategy_id": strategy_id, **await revision_store.load_revision(db, revision)}
+
+@router.get("/strategies/{strategy_id}/diff")
+async def diff_strategy_revisions(
+    strategy_id: str,
+    from_version: int,
+    to_version: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Unified diffs of the definition and MQL5 code between two versions"""
+    old = await _get_revision(db, strategy_id, from_version)
+    new = await _get_revision(db, strategy_id, to_version)
+    return {
+        "strategy_id": strategy_id,
+        "from_version": from_version,
+        "to_version": to_version,
+        **await revision_store.diff(db, old, new)
+    }
+
+@router.get("/strategies/{strategy_id}/scan")
+async def scan_strategy(
+    strategy_id: str,
+    timeframe: Optional[str] = None,
+    limit: int = 50,
+    triggered_only: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Scan every visible symbol for the strategy's entry conditions
+    Results are ranked by relative distance to trigger (0 = conditions met now)
+    """
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    
+    strategy = await db.scalar(select(Strategy).where(Strategy.id == strategy_id))
+    if not strategy:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    
+    symbols = mt5_service.get_symbols()
+    if not symbols:
+        raise HTTPException(status_code=503, detail="Symbol list not available")
+    
+    timeframe = (timeframe or strategy.timeframe).upper()
+    started = datetime.now()
+    scan = await market_scanner.scan(strategy.visual_elements, timeframe, symbols)
+    
+    results = scan["results"]
+    if triggered_only:
+        results = [r for r in results if r["triggered"]]
+    
+    return {
+        "strategy_id": str(strategy.id),
+        "timeframe": timeframe,
+        "scanned": len(symbols),
+        "failed": scan["failed"],
+        "matches": sum(1 for r in scan["results"] if r["triggered"]),
+        "results": results[:limit],
+        "execution_time_ms": int((datetime.now() - started).total_seconds() * 1000)
+    }
+
 # ==================== BACKTEST ENDPOINTS ====================
 
 @router.post("/backtests")
-async def run_backtest(request: BacktestRequest, db: Session = Depends(get_db)):
+async def run_backtest(
+    request: BacktestRequest,
+    http_request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Run backtest on strategy"""
     # Get strategy
-    strategy = db.query(Strategy).filter(Strategy.id == request.strategy_id).first()
+    strategy = await db.scalar(select(Strategy).where(Strategy.id == request.strategy_id))
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
     
@@ -290,15 +530,28 @@ async def run_backtest(request: BacktestRequest, db: Session = Depends(get_db)):
             profit_factor=results['profit_factor'],
             max_drawdown=results['max_drawdown'],
             sharpe_ratio=results['sharpe_ratio'],
-            trades=results['trades'],
-            equity_curve=results['equity_curve'],
+            trades_blob=encode_series(results['trades']),
+            equity_blob=encode_series(results['equity_curve']),
             execution_time_ms=results['execution_time_ms'],
             status='completed'
         )
         
         db.add(backtest)
-        db.commit()
-        db.refresh(backtest)
+        await db.flush()
+        await strategy_stats.record_backtest(db, backtest.id)
+        await db.commit()
+        await db.refresh(backtest)
+        
+        if wants_columnar(http_request):
+            results = {
+                **results,
+                "trades": records_to_columns(results['trades']),
+                "equity_curve": records_to_columns(results['equity_curve'])
+            }
+            return columnar_response({
+                "backtest_id": str(backtest.id),
+                "results": results
+            })
         
         return {
             "backtest_id": str(backtest.id),
@@ -309,13 +562,47 @@ async def run_backtest(request: BacktestRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Backtest failed: {str(e)}")
 
 @router.get("/backtests/{backtest_id}")
-async def get_backtest(backtest_id: str, db: Session = Depends(get_db)):
-    """Get backtest results"""
-    backtest = db.query(Backtest).filter(Backtest.id == backtest_id).first()
-    if not backtest:
+async def get_backtest(
+    backtest_id: str,
+    request: Request,
+    include: Optional[str] = None,
+    trades_offset: int = 0,
+    trades_limit: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get backtest results
+    
+    Only the summary is returned by default. Pass `include=trades,equity` for the
+    trade ledger and equity curve; trades can be paged with `trades_offset` and
+    `trades_limit`, sliced inside Postgres so large ledgers are never read whole.
+    """
+    includes = {part.strip() for part in include.split(",") if part.strip()} if include else set()
+    if not includes <= BACKTEST_INCLUDES:
+        raise HTTPException(status_code=400, detail=f"include must be a subset of {sorted(BACKTEST_INCLUDES)}")
+    if trades_offset < 0 or (trades_limit is not None and trades_limit < 0):
+        raise HTTPException(status_code=400, detail="trades_offset and trades_limit must not be negative")
+    
+    query = select(Backtest).where(Backtest.id == backtest_id)
+    if "equity" in includes:
+        query = query.options(undefer(Backtest.equity_blob), undefer(Backtest.equity_curve))
+    if "trades" in includes:
+        # Legacy JSONB rows are paged inside Postgres; offsets are validated
+        # ints, so the jsonpath literal is safe to inline
+        last = "last" if trades_limit is None else trades_offset + trades_limit - 1
+        trades_page = func.jsonb_path_query_array(
+            Backtest.trades, literal_column(f"'$[{trades_offset} to {last}]'::jsonpath")
+        )
+        query = query.options(undefer(Backtest.trades_blob)).add_columns(
+            trades_page, func.jsonb_array_length(Backtest.trades)
+        )
+    
+    row = (await db.execute(query)).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Backtest not found")
+    backtest = row[0]
     
-    return {
+    response = {
         "id": str(backtest.id),
         "strategy_id": str(backtest.strategy_id),
         "start_date": backtest.start_date.isoformat(),
@@ -329,16 +616,77 @@ async def get_backtest(backtest_id: str, db: Session = Depends(get_db)):
         "profit_factor": float(backtest.profit_factor),
         "max_drawdown": float(backtest.max_drawdown),
         "sharpe_ratio": float(backtest.sharpe_ratio),
-        "trades": backtest.trades,
-        "equity_curve": backtest.equity_curve,
         "execution_time_ms": backtest.execution_time_ms,
         "status": backtest.status
     }
+    columnar = wants_columnar(request)
+    
+    if "trades" in includes:
+        if backtest.trades_blob is not None:
+            trades = SeriesBlob(backtest.trades_blob)
+            response["trades_total"] = len(trades)
+            response["trades"] = (
+                trades.columns(trades_offset, trades_limit) if columnar
+                else trades.records(trades_offset, trades_limit)
+            )
+        else:
+            page = row[1] if trades_limit != 0 else []
+            response["trades_total"] = row[2]
+            response["trades"] = records_to_columns(page) if columnar else page
+        response["trades_offset"] = trades_offset
+    
+    if "equity" in includes:
+        if backtest.equity_blob is not None:
+            equity = SeriesBlob(backtest.equity_blob)
+            response["equity_curve"] = equity.columns() if columnar else equity.records()
+        else:
+            legacy = backtest.equity_curve
+            response["equity_curve"] = records_to_columns(legacy) if columnar else legacy
+    
+    if columnar:
+        return columnar_response(response)
+    
+    return response
 
 @router.get("/strategies/{strategy_id}/backtests")
-async def list_strategy_backtests(strategy_id: str, db: Session = Depends(get_db)):
-    """List all backtests for a strategy"""
-    backtests = db.query(Backtest).filter(Backtest.strategy_id == strategy_id).all()
+async def list_strategy_backtests(
+    strategy_id: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    min_win_rate: Optional[float] = None,
+    min_profit_factor: Optional[float] = None,
+    max_drawdown: Optional[float] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    List a strategy's backtests, newest first (summary columns only)
+    
+    Optional metric thresholds narrow the list; pages continue from the
+    `X-Next-Cursor` response header passed back as `cursor`.
+    """
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    
+    query = select(
+        Backtest.id, Backtest.start_date, Backtest.end_date, Backtest.final_balance,
+        Backtest.total_trades, Backtest.win_rate, Backtest.created_at
+    ).where(Backtest.strategy_id == strategy_id)
+    if min_win_rate is not None:
+        query = query.where(Backtest.win_rate >= min_win_rate)
+    if min_profit_factor is not None:
+        query = query.where(Backtest.profit_factor >= min_profit_factor)
+    if max_drawdown is not None:
+        query = query.where(Backtest.max_drawdown <= max_drawdown)
+    
+    try:
+        query = keyset_page(query, Backtest.created_at, Backtest.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    backtests, next_cursor = split_page((await db.execute(query)).all(), limit, "created_at")
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [
         {
             "id": str(b.id),
@@ -350,4 +698,68 @@ async def list_strategy_backtests(strategy_id: str, db: Session = Depends(get_db
             "created_at": b.created_at.isoformat()
         }
         for b in backtests
-    ]
\ No newline at end of file
+    ]
+
+@router.get("/leaderboard")
+async def strategy_leaderboard(
+    metric: str = "avg_profit_factor",
+    limit: int = 50,
+    min_backtests: int = 1,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Rank active strategies by an aggregate backtest metric
+    
+    Served from strategy_stats, which is updated as each backtest is saved,
+    so the cost depends on `limit` and not on how many backtests exist.
+    """
+    if metric not in LEADERBOARD_METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(LEADERBOARD_METRICS)}")
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    
+    column = getattr(StrategyStats, metric)
+    order = column.desc() if LEADERBOARD_METRICS[metric] else column.asc()
+    query = (
+        select(StrategyStats, Strategy.name, Strategy.symbol, Strategy.timeframe)
+        .join(Strategy, Strategy.id == StrategyStats.strategy_id)
+        .where(StrategyStats.is_active == True, column.is_not(None))
+        .order_by(order.nulls_last(), StrategyStats.strategy_id)
+        .limit(limit)
+    )
+    if min_backtests > 1:
+        query = query.where(StrategyStats.backtest_count >= min_backtests)
+    
+    def number(value):
+        return float(value) if value is not None else None
+    
+    rows = (await db.execute(query)).all()
+    return [
+        {
+            "rank": rank,
+            "strategy_id": str(stats.strategy_id),
+            "name": name,
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "value": number(getattr(stats, metric)),
+            "backtest_count": stats.backtest_count,
+            "total_trades": stats.total_trades,
+            "avg_win_rate": number(stats.avg_win_rate),
+            "avg_profit_factor": number(stats.avg_profit_factor),
+            "avg_max_drawdown": number(stats.avg_max_drawdown),
+            "avg_sharpe_ratio": number(stats.avg_sharpe_ratio),
+            "best_profit_factor": number(stats.best_profit_factor),
+            "best_net_profit": number(stats.best_net_profit),
+            "worst_net_profit": number(stats.worst_net_profit),
+            "worst_max_drawdown": number(stats.worst_max_drawdown),
+            "latest": {
+                "backtest_id": str(stats.latest_backtest_id),
+                "created_at": stats.latest_at.isoformat(),
+                "win_rate": number(stats.latest_win_rate),
+                "profit_factor": number(stats.latest_profit_factor),
+                "max_drawdown": number(stats.latest_max_drawdown),
+                "net_profit": number(stats.latest_net_profit)
+            }
+        }
+        for rank, (stats, name, symbol, timeframe) in enumerate(rows, start=1)
+    ]
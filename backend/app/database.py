@@ -1,7 +1,8 @@
 # database.py
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, Boolean, Text, DECIMAL, BigInteger, ForeignKey
+from sqlalchemy import create_engine, Column, String, Integer, DateTime, Boolean, Text, DECIMAL, BigInteger, ForeignKey, UniqueConstraint, LargeBinary, Index, Computed
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, deferred
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from datetime import datetime
 import uuid
@@ -12,6 +13,20 @@ engine = create_engine(settings.DATABASE_URL, echo=settings.DEBUG)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async engine for request handlers, so queries do not block the event loop
+def _async_url(url: str) -> str:
+    """Point a postgresql:// URL at the asyncpg driver"""
+    scheme, _, rest = url.partition("://")
+    return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgresql") else url
+
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or _async_url(settings.DATABASE_URL),
+    echo=settings.DEBUG,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 # Dependency for FastAPI
 def get_db():
     db = SessionLocal()
@@ -20,6 +35,10 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # ==================== MODELS ====================
 
 class Strategy(Base):
@@ -52,6 +71,13 @@ class Strategy(Base):
     # Relationships
     backtests = relationship("Backtest", back_populates="strategy", cascade="all, delete-orphan")
     revisions = relationship("StrategyRevision", back_populates="strategy", cascade="all, delete-orphan")
+    
+    # Keyset pagination: newest first, optionally filtered by symbol/timeframe
+    __table_args__ = (
+        UniqueConstraint('name', 'version', name='unique_strategy_name'),
+        Index('idx_strategies_updated', updated_at.desc(), id.desc(), postgresql_where=(is_active == True)),
+        Index('idx_strategies_symbol_timeframe', symbol, timeframe, updated_at.desc(), id.desc(), postgresql_where=(is_active == True)),
+    )
 
 
 class Backtest(Base):
@@ -75,9 +101,13 @@ class Backtest(Base):
     max_drawdown = Column(DECIMAL(10, 2))
     sharpe_ratio = Column(DECIMAL(10, 4))
     
-    # Detailed data
-    trades = Column(JSONB, nullable=False, default=[])
-    equity_curve = Column(JSONB, nullable=False, default=[])
+    # Detailed data (not loaded unless asked for with undefer()).
+    # New rows store compressed columnar blobs (services/series_codec.py);
+    # the JSONB arrays are only populated on rows written before them.
+    trades = deferred(Column(JSONB, nullable=False, default=[]))
+    equity_curve = deferred(Column(JSONB, nullable=False, default=[]))
+    trades_blob = deferred(Column(LargeBinary))
+    equity_blob = deferred(Column(LargeBinary))
     
     # Execution
     execution_time_ms = Column(Integer)
@@ -88,6 +118,67 @@ class Backtest(Base):
     
     # Relationships
     strategy = relationship("Strategy", back_populates="backtests")
+    
+    # Keyset pagination per strategy plus metric threshold filters
+    __table_args__ = (
+        Index('idx_strategy_backtests', strategy_id, created_at.desc(), id.desc()),
+        Index('idx_backtests_win_rate', strategy_id, win_rate),
+        Index('idx_backtests_profit_factor', strategy_id, profit_factor),
+    )
+
+
+class StrategyStats(Base):
+    __tablename__ = "strategy_stats"
+    
+    # One row per strategy, upserted in the same transaction that saves a
+    # backtest (services/strategy_stats.py). Averages are generated columns
+    # so the leaderboard can rank on an index.
+    
+    strategy_id = Column(UUID(as_uuid=True), ForeignKey('strategies.id', ondelete='CASCADE'), primary_key=True)
+    is_active = Column(Boolean, nullable=False, default=True)
+    
+    # Counts and sums
+    backtest_count = Column(Integer, nullable=False, default=0)
+    total_trades = Column(BigInteger, nullable=False, default=0)
+    sum_win_rate = Column(DECIMAL, nullable=False, default=0)
+    sum_profit_factor = Column(DECIMAL, nullable=False, default=0)
+    sum_max_drawdown = Column(DECIMAL, nullable=False, default=0)
+    sum_sharpe_ratio = Column(DECIMAL, nullable=False, default=0)
+    sum_net_profit = Column(DECIMAL, nullable=False, default=0)
+    
+    # Averages
+    avg_win_rate = Column(DECIMAL(10, 4), Computed("ROUND(sum_win_rate / NULLIF(backtest_count, 0), 4)", persisted=True))
+    avg_profit_factor = Column(DECIMAL(10, 4), Computed("ROUND(sum_profit_factor / NULLIF(backtest_count, 0), 4)", persisted=True))
+    avg_max_drawdown = Column(DECIMAL(10, 4), Computed("ROUND(sum_max_drawdown / NULLIF(backtest_count, 0), 4)", persisted=True))
+    avg_sharpe_ratio = Column(DECIMAL(10, 4), Computed("ROUND(sum_sharpe_ratio / NULLIF(backtest_count, 0), 4)", persisted=True))
+    
+    # Best and worst
+    best_win_rate = Column(DECIMAL(5, 2))
+    best_profit_factor = Column(DECIMAL(10, 2))
+    best_sharpe_ratio = Column(DECIMAL(10, 4))
+    best_net_profit = Column(DECIMAL(15, 2))
+    worst_net_profit = Column(DECIMAL(15, 2))
+    worst_max_drawdown = Column(DECIMAL(10, 2))
+    
+    # Most recent backtest
+    latest_backtest_id = Column(UUID(as_uuid=True))
+    latest_at = Column(DateTime)
+    latest_win_rate = Column(DECIMAL(5, 2))
+    latest_profit_factor = Column(DECIMAL(10, 2))
+    latest_max_drawdown = Column(DECIMAL(10, 2))
+    latest_net_profit = Column(DECIMAL(15, 2))
+    
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Leaderboard orderings (see LEADERBOARD_METRICS in api/routes.py)
+    __table_args__ = (
+        Index('idx_stats_avg_profit_factor', avg_profit_factor.desc().nulls_last(), strategy_id, postgresql_where=(is_active == True)),
+        Index('idx_stats_avg_win_rate', avg_win_rate.desc().nulls_last(), strategy_id, postgresql_where=(is_active == True)),
+        Index('idx_stats_avg_sharpe_ratio', avg_sharpe_ratio.desc().nulls_last(), strategy_id, postgresql_where=(is_active == True)),
+        Index('idx_stats_avg_max_drawdown', avg_max_drawdown.asc().nulls_last(), strategy_id, postgresql_where=(is_active == True)),
+        Index('idx_stats_best_net_profit', best_net_profit.desc().nulls_last(), strategy_id, postgresql_where=(is_active == True)),
+        Index('idx_stats_latest_profit_factor', latest_profit_factor.desc().nulls_last(), strategy_id, postgresql_where=(is_active == True)),
+    )
 
 
 class MarketData(Base):
@@ -104,6 +195,23 @@ class MarketData(Base):
     low = Column(DECIMAL(15, 5), nullable=False)
     close = Column(DECIMAL(15, 5), nullable=False)
     tick_volume = Column(BigInteger, nullable=False)
+    
+    __table_args__ = (UniqueConstraint('symbol', 'timeframe', 'timestamp', name='unique_candle'),)
+
+
+class MarketDataRange(Base):
+    __tablename__ = "market_data_ranges"
+    
+    # A span of market_data fetched in full from the terminal; bars missing
+    # inside one are market closures, not cache gaps
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    symbol = Column(String(20), nullable=False)
+    timeframe = Column(String(10), nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (Index('idx_market_data_ranges_lookup', 'symbol', 'timeframe', 'end_time'),)
 
 
 class StrategyRevision(Base):
@@ -113,9 +221,13 @@ class StrategyRevision(Base):
     strategy_id = Column(UUID(as_uuid=True), ForeignKey('strategies.id'), nullable=False)
     version = Column(Integer, nullable=False)
     
-    # Snapshot
-    snapshot = Column(JSONB, nullable=False)
-    mql5_code = Column(Text)
+    # Content-addressed snapshot and code (see services/revision_store.py)
+    snapshot_hash = Column(String(64), ForeignKey('content_blobs.hash'))
+    code_hash = Column(String(64), ForeignKey('content_blobs.hash'))
+    
+    # Legacy inline copies
+    snapshot = deferred(Column(JSONB))
+    mql5_code = deferred(Column(Text))
     
     # Metadata
     commit_message = Column(Text)
@@ -123,6 +235,21 @@ class StrategyRevision(Base):
     
     # Relationships
     strategy = relationship("Strategy", back_populates="revisions")
+    
+    __table_args__ = (UniqueConstraint('strategy_id', 'version', name='unique_revision'),)
+
+
+class ContentBlob(Base):
+    __tablename__ = "content_blobs"
+    
+    # sha256 of the full text, whichever way it is stored
+    hash = Column(String(64), primary_key=True)
+    kind = Column(String(10), nullable=False)  # full | delta
+    base_hash = Column(String(64), ForeignKey('content_blobs.hash'))
+    depth = Column(Integer, nullable=False, default=0)  # deltas to apply from the nearest full blob
+    size = Column(Integer, nullable=False)  # uncompressed length
+    data = Column(LargeBinary, nullable=False)  # zlib-compressed text, or line delta against base_hash
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 
 class DrawingTemplate(Base):
@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from services.mt5_service import TIMEFRAME_SECONDS
+
+BAR_UPDATE = "bar_update"  # the forming bar changed
+BAR_CLOSED = "bar_closed"  # a bar is complete and will not change again
+
+# MT5 weekly bars open on Sunday; the epoch (1970-01-01) was a Thursday
+_WEEK_OFFSET = 3 * 86400
+
+
+def bar_open_time(timeframe: str, timestamp: int) -> int:
+    """Open time (epoch seconds) of the bar containing a timestamp"""
+    if timeframe == "MN1":
+        dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+        return int(datetime(dt.year, dt.month, 1, tzinfo=timezone.utc).timestamp())
+    if timeframe == "W1":
+        return (timestamp - _WEEK_OFFSET) // TIMEFRAME_SECONDS["W1"] * TIMEFRAME_SECONDS["W1"] + _WEEK_OFFSET
+    seconds = TIMEFRAME_SECONDS[timeframe]
+    return timestamp - timestamp % seconds
+
+
+class BarBuilder:
+    """
+    Builds OHLCV bars from ticks for every timeframe at once
+
+    Bars are built from the bid like MT5's own charts, with volume counting
+    ticks. Each tick yields a bar_update for every timeframe, preceded by a
+    bar_closed for any timeframe whose bar it rolled over.
+
+    The first bar of a timeframe only holds the ticks seen since startup, so
+    it is marked partial until seed() fills it in from the terminal's own
+    forming bar. A bar that is still partial when it rolls over is dropped
+    instead of being announced as closed.
+    """
+
+    def __init__(self, timeframes: Optional[List[str]] = None):
+        self.timeframes = timeframes or list(TIMEFRAME_SECONDS)
+        self.bars: Dict[str, Dict[str, Dict]] = {}
+
+    def on_tick(self, symbol: str, price: Dict) -> List[Tuple[str, str, Dict]]:
+        """
+        Fold a tick into the symbol's forming bars
+
+        Returns:
+            List of (event, timeframe, bar) tuples
+        """
+        timestamp = int(price['time_msc']) // 1000
+        bid = price['bid']
+        forming = self.bars.setdefault(symbol, {})
+        events = []
+
+        for timeframe in self.timeframes:
+            open_time = bar_open_time(timeframe, timestamp)
+            bar = forming.get(timeframe)
+
+            if bar is not None and open_time < bar['time']:
+                # Late tick for a bar that already closed
+                continue
+
+            if bar is None or open_time > bar['time']:
+                if bar is not None and not bar['partial']:
+                    events.append((BAR_CLOSED, timeframe, bar))
+                bar = forming[timeframe] = {
+                    'time': open_time,
+                    'open': bid,
+                    'high': bid,
+                    'low': bid,
+                    'close': bid,
+                    'volume': 0,
+                    'partial': bar is None
+                }
+
+            bar['high'] = max(bar['high'], bid)
+            bar['low'] = min(bar['low'], bid)
+            bar['close'] = bid
+            bar['volume'] += 1
+            events.append((BAR_UPDATE, timeframe, bar))
+
+        return events
+
+    def seed(self, symbol: str, timeframe: str, rate: Dict):
+        """
+        Start or complete a symbol's first bar from the terminal's forming bar
+
+        rate has the bar fields (time, open, high, low, close, volume). It is
+        ignored once the timeframe has a complete bar or has moved past it.
+        """
+        forming = self.bars.setdefault(symbol, {})
+        bar = forming.get(timeframe)
+        if bar is None:
+            forming[timeframe] = {**rate, 'partial': False}
+        elif bar['partial'] and bar['time'] == rate['time']:
+            # Ticks already folded in are newer than or part of the terminal's bar
+            bar['open'] = rate['open']
+            bar['high'] = max(bar['high'], rate['high'])
+            bar['low'] = min(bar['low'], rate['low'])
+            bar['volume'] = max(bar['volume'], rate['volume'])
+            bar['partial'] = False
+
+    def forming_bar(self, symbol: str, timeframe: str) -> Optional[Dict]:
+        """Current forming bar for a symbol/timeframe, if any ticks were seen"""
+        return self.bars.get(symbol, {}).get(timeframe)
+
+    def reset(self, symbol: str):
+        """Forget a symbol's forming bars"""
+        self.bars.pop(symbol, None)
+
+
+def bar_to_message(bar: Dict) -> Dict:
+    """Serialize a bar like a historical-data row"""
+    message = {
+        'timestamp': datetime.fromtimestamp(bar['time'], tz=timezone.utc).replace(tzinfo=None).isoformat(),
+        'open': bar['open'],
+        'high': bar['high'],
+        'low': bar['low'],
+        'close': bar['close'],
+        'volume': bar['volume']
+    }
+    if bar.get('partial'):
+        # Built only from ticks seen since startup; open/high/low/volume are incomplete
+        message['partial'] = True
+    return message
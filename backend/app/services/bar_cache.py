@@ -0,0 +1,140 @@
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Optional
+from loguru import logger
+from sqlalchemy.dialects.postgresql import insert
+from database import SessionLocal, MarketData, MarketDataRange
+from services.mt5_service import mt5_service, TIMEFRAME_SECONDS
+
+class BarCache:
+    """
+    Local bar cache on top of the market_data table
+
+    Every span fetched from the terminal is recorded in market_data_ranges.
+    A range is read from Postgres only when recorded spans cover it end to
+    end; otherwise it is fetched from the terminal and written back, so the
+    next read is local. Bars still forming when fetched are not cached.
+    """
+
+    def get_bars(
+        self,
+        symbol: str,
+        timeframe: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Optional[pd.DataFrame]:
+        """
+        Bars for a range, oldest first (blocking)
+
+        Returns:
+            DataFrame with columns [timestamp, open, high, low, close, volume]
+        """
+        timeframe = timeframe.upper()
+        bar = timedelta(seconds=TIMEFRAME_SECONDS.get(timeframe, 3600))
+        # Bar times are terminal server time, so closed bars are judged by the
+        # terminal's clock: a bar at or before closed_until has closed
+        server_now = self._server_time(symbol)
+        closed_until = min(end_date, server_now - bar) if server_now is not None else None
+        if self._covers(symbol, timeframe, start_date, closed_until or end_date):
+            return self._read(symbol, timeframe, start_date, end_date)
+
+        data = mt5_service.get_historical_data(symbol, timeframe, start_date, end_date)
+        if data is None or len(data) == 0:
+            cached = self._read(symbol, timeframe, start_date, end_date)
+            return cached if len(cached) else None
+
+        first, newest = data['timestamp'].iloc[0].to_pydatetime(), data['timestamp'].iloc[-1].to_pydatetime()
+        if closed_until is None:
+            # No tick to read the terminal's time from: the newest bar may still be forming
+            closed_until = newest - timedelta(microseconds=1)
+        try:
+            # The terminal may hold less history than asked for; only what it returned is covered
+            self._write(symbol, timeframe, data[data['timestamp'] <= closed_until], max(start_date, first), closed_until)
+        except Exception as e:
+            logger.error(f"Failed to cache bars for {symbol} {timeframe}: {e}")
+        return data
+
+    def _server_time(self, symbol: str) -> Optional[datetime]:
+        """The terminal's current time, from the symbol's last tick (naive, like bar timestamps)"""
+        price = mt5_service.get_current_price(symbol)
+        if price is None:
+            return None
+        return pd.to_datetime(price['time_msc'], unit='ms').to_pydatetime()
+
+    def _covers(self, symbol: str, timeframe: str, start_date: datetime, end_date: datetime) -> bool:
+        """Whether recorded spans cover [start_date, end_date] without a hole"""
+        if end_date < start_date:
+            return False
+
+        db = SessionLocal()
+        try:
+            spans = db.query(MarketDataRange.start_time, MarketDataRange.end_time).filter(
+                MarketDataRange.symbol == symbol,
+                MarketDataRange.timeframe == timeframe,
+                MarketDataRange.end_time >= start_date,
+                MarketDataRange.start_time <= end_date
+            ).order_by(MarketDataRange.start_time).all()
+        finally:
+            db.close()
+
+        covered_to = start_date
+        for span_start, span_end in spans:
+            if span_start > covered_to:
+                return False
+            covered_to = max(covered_to, span_end)
+            if covered_to >= end_date:
+                return True
+        return False
+
+    def _read(self, symbol: str, timeframe: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                MarketData.timestamp, MarketData.open, MarketData.high,
+                MarketData.low, MarketData.close, MarketData.tick_volume
+            ).filter(
+                MarketData.symbol == symbol,
+                MarketData.timeframe == timeframe,
+                MarketData.timestamp >= start_date,
+                MarketData.timestamp <= end_date
+            ).order_by(MarketData.timestamp).all()
+        finally:
+            db.close()
+
+        df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        for column in ('open', 'high', 'low', 'close'):
+            df[column] = df[column].astype(float)
+        df['volume'] = df['volume'].astype('int64')
+        return df
+
+    def _write(self, symbol: str, timeframe: str, data: pd.DataFrame, start_date: datetime, end_date: datetime):
+        rows = [
+            {
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "timestamp": row.timestamp.to_pydatetime(),
+                "open": float(row.open),
+                "high": float(row.high),
+                "low": float(row.low),
+                "close": float(row.close),
+                "tick_volume": int(row.volume)
+            }
+            for row in data.itertuples(index=False)
+        ]
+
+        db = SessionLocal()
+        try:
+            for i in range(0, len(rows), 5000):
+                stmt = insert(MarketData).values(rows[i:i + 5000]).on_conflict_do_nothing(
+                    index_elements=['symbol', 'timeframe', 'timestamp']
+                )
+                db.execute(stmt)
+            if end_date >= start_date:
+                db.add(MarketDataRange(symbol=symbol, timeframe=timeframe, start_time=start_date, end_time=end_date))
+            db.commit()
+        finally:
+            db.close()
+
+
+# Singleton instance
+bar_cache = BarCache()
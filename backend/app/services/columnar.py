@@ -0,0 +1,86 @@
+import msgpack
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List
+from fastapi import Request
+from fastapi.responses import Response
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+# Columns holding timestamps, sent as int64 epoch milliseconds
+TIME_COLUMNS = {"timestamp", "time", "entry_time", "exit_time"}
+
+
+def wants_columnar(request: Request) -> bool:
+    """Check whether the client asked for the columnar MessagePack format"""
+    accept = request.headers.get("accept", "")
+    return MSGPACK_MEDIA_TYPE in accept
+
+
+def frame_to_columns(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Convert a DataFrame into a dict of typed column arrays
+
+    Numeric and datetime columns become contiguous NumPy arrays (datetimes as
+    int64 epoch milliseconds), anything else is left as a plain list.
+    """
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if name in TIME_COLUMNS and pd.api.types.is_string_dtype(series):
+            series = pd.to_datetime(series, errors="coerce")
+
+        if pd.api.types.is_datetime64_any_dtype(series):
+            if series.dt.tz is not None:
+                series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+            columns[name] = series.values.astype("datetime64[ms]").astype("<i8")
+        elif pd.api.types.is_bool_dtype(series):
+            columns[name] = np.ascontiguousarray(series.values, dtype="|b1")
+        elif pd.api.types.is_numeric_dtype(series):
+            columns[name] = np.ascontiguousarray(series.values).astype(series.dtype.newbyteorder("<"))
+        else:
+            columns[name] = series.tolist()
+    return columns
+
+
+def records_to_columns(records: List[Dict]) -> Dict[str, Any]:
+    """Convert a list of row dicts (trades, equity points) into typed columns"""
+    if not records:
+        return {}
+    return frame_to_columns(pd.DataFrame.from_records(records))
+
+
+def _pack_default(obj: Any) -> Any:
+    """Encode values MessagePack does not know natively"""
+    if isinstance(obj, np.ndarray):
+        # Typed arrays are shipped as raw little-endian buffers
+        return {
+            "dtype": obj.dtype.str,
+            "length": len(obj),
+            "data": obj.tobytes()
+        }
+    if isinstance(obj, datetime):
+        if obj.tzinfo is None:
+            obj = obj.replace(tzinfo=timezone.utc)
+        return int(obj.timestamp() * 1000)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def pack(payload: Dict) -> bytes:
+    """Serialize a payload to MessagePack"""
+    return msgpack.packb(payload, default=_pack_default, use_bin_type=True, datetime=False)
+
+
+def columnar_response(payload: Dict) -> Response:
+    """Build a MessagePack response from a payload with columnar sections"""
+    return Response(
+        content=pack(payload),
+        media_type=MSGPACK_MEDIA_TYPE,
+        headers={"Vary": "Accept"}
+    )
@@ -0,0 +1,88 @@
+import msgpack
+from typing import Dict, List, Tuple, Union
+
+# Frame kinds for compact price updates
+FRAME_KEY = 0    # absolute values: [0, sid, time_ms, bid_pts, ask_pts, tick_count, high_off, low_off]
+FRAME_DELTA = 1  # changes since the previous frame for that symbol, same layout
+
+ENCODING_JSON = "json"        # frames sent as JSON arrays in text messages
+ENCODING_MSGPACK = "msgpack"  # every message sent as a binary MessagePack frame
+
+class CompactPriceEncoder:
+    """
+    Opt-in compact wire format for price_update messages on /ws
+
+    Symbols are replaced by small integer ids announced once in a
+    symbol_table message. Prices travel as integer point counts: the first
+    frame for a symbol is absolute, later frames are deltas from the last
+    value actually sent, with times as epoch-millisecond deltas. The interval
+    high/low are sent as point offsets from the bid.
+
+    The encoder runs in the connection's writer just before a message hits the
+    socket, so messages dropped or conflated in the queue never break the
+    delta chain. Other message types pass through unchanged.
+    """
+
+    def __init__(self, encoding: str = ENCODING_JSON):
+        if encoding not in (ENCODING_JSON, ENCODING_MSGPACK):
+            raise ValueError(f"Unknown compact encoding: {encoding}")
+        self.encoding = encoding
+        self.symbol_ids: Dict[str, int] = {}
+        self.scales: Dict[str, float] = {}
+        self.last_sent: Dict[str, Tuple[int, int, int]] = {}
+
+    def encode(self, message: Union[dict, list, str, bytes]) -> List[Union[dict, list, str, bytes]]:
+        """Turn one queued message into the frames to write"""
+        if isinstance(message, dict) and message.get('type') == 'price_update' and self._known(message['data']):
+            frames = self._encode_price(message['data'])
+        else:
+            frames = [message]
+
+        if self.encoding == ENCODING_MSGPACK:
+            return [f if isinstance(f, (str, bytes)) else msgpack.packb(f, use_bin_type=True) for f in frames]
+        return frames
+
+    def _known(self, data: Dict) -> bool:
+        """
+        Whether a symbol's point scale is known
+
+        Until the producer has read the symbol's digits its updates go out as
+        plain price_update messages; guessing a scale would fix the wrong one
+        for the rest of the connection.
+        """
+        return data['symbol'] in self.scales or data.get('digits') is not None
+
+    def _encode_price(self, data: Dict) -> List[Union[dict, list]]:
+        frames = []
+        symbol = data['symbol']
+
+        sid = self.symbol_ids.get(symbol)
+        if sid is None:
+            sid = self.symbol_ids[symbol] = len(self.symbol_ids)
+            digits = int(data['digits'])
+            self.scales[symbol] = 10 ** digits
+            frames.append({
+                "type": "symbol_table",
+                "symbols": {symbol: {"id": sid, "digits": digits}}
+            })
+
+        scale = self.scales[symbol]
+        time_ms = int(data['time_msc'])
+        bid = round(data['bid'] * scale)
+        ask = round(data['ask'] * scale)
+        high_off = round(data.get('high', data['bid']) * scale) - bid
+        low_off = round(data.get('low', data['bid']) * scale) - bid
+        tick_count = data.get('tick_count', 1)
+
+        previous = self.last_sent.get(symbol)
+        self.last_sent[symbol] = (time_ms, bid, ask)
+
+        if previous is None:
+            frames.append([FRAME_KEY, sid, time_ms, bid, ask, tick_count, high_off, low_off])
+        else:
+            frames.append([
+                FRAME_DELTA, sid,
+                time_ms - previous[0], bid - previous[1], ask - previous[2],
+                tick_count, high_off, low_off
+            ])
+        return frames
@@ -0,0 +1,173 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List, Optional, Union
+from fastapi import WebSocket
+from loguru import logger
+from config import settings
+
+# What to do when a client's outbound queue is full
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # discard the oldest queued message
+OVERFLOW_CONFLATE = "conflate"        # replace a queued message with the same key, else drop oldest
+OVERFLOW_DISCONNECT = "disconnect"    # evict the slow client
+
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_CONFLATE, OVERFLOW_DISCONNECT)
+
+Message = Union[dict, list, str, bytes]
+
+class ClientConnection:
+    """
+    One WebSocket with a bounded outbound queue drained by its own writer task
+
+    Enqueueing never awaits the socket, so a slow reader only ever backs up
+    its own queue. Queue entries are [key, message] lists; keyed entries are
+    tracked so the conflate policy can overwrite them in place.
+    """
+
+    def __init__(self, websocket: WebSocket, max_queue: int, overflow_policy: str, on_error):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.on_error = on_error
+
+        self.queue: Deque[List] = deque()
+        self.pending: Dict[str, List] = {}
+        self.ready = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+        self.dropped = 0
+        # Optional per-connection wire format, applied at write time
+        self.encoder = None
+
+    def start(self):
+        self.writer = asyncio.create_task(self._write())
+
+    def enqueue(self, message: Message, key: Optional[str] = None) -> bool:
+        """Queue a message for sending; returns False if the client was evicted"""
+        if self.closed:
+            return False
+
+        if key is not None and self.overflow_policy == OVERFLOW_CONFLATE:
+            entry = self.pending.get(key)
+            if entry is not None:
+                entry[1] = message
+                return True
+
+        if len(self.queue) >= self.max_queue:
+            if self.overflow_policy == OVERFLOW_DISCONNECT:
+                logger.warning("WebSocket client too slow, disconnecting")
+                self.on_error(self.websocket, close_code=1013)
+                return False
+            self._forget(self.queue.popleft())
+            self.dropped += 1
+
+        entry = [key, message]
+        self.queue.append(entry)
+        if key is not None:
+            self.pending[key] = entry
+        self.ready.set()
+        return True
+
+    def close(self):
+        self.closed = True
+        self.queue.clear()
+        self.pending.clear()
+        if self.writer is not None and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+
+    def _forget(self, entry: List):
+        key = entry[0]
+        if key is not None and self.pending.get(key) is entry:
+            del self.pending[key]
+
+    async def _write(self):
+        """Drain the queue onto the socket"""
+        try:
+            while True:
+                await self.ready.wait()
+                while self.queue:
+                    entry = self.queue.popleft()
+                    self._forget(entry)
+                    message = entry[1]
+                    frames = self.encoder.encode(message) if self.encoder else (message,)
+                    for frame in frames:
+                        await self._send(frame)
+                self.ready.clear()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"WebSocket send failed, evicting client: {e}")
+            self.on_error(self.websocket, close_code=1011)
+
+    async def _send(self, frame: Message):
+        if isinstance(frame, bytes):
+            await self.websocket.send_bytes(frame)
+        elif isinstance(frame, str):
+            await self.websocket.send_text(frame)
+        else:
+            await self.websocket.send_json(frame)
+
+
+class ConnectionManager:
+    """Tracks WebSocket clients and delivers messages through per-client queues"""
+
+    def __init__(
+        self,
+        max_queue: int = settings.WS_SEND_QUEUE_SIZE,
+        overflow_policy: str = settings.WS_OVERFLOW_POLICY
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown WebSocket overflow policy: {overflow_policy}")
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+
+    async def connect(self, websocket: WebSocket):
+        await websocket.accept()
+        client = ClientConnection(websocket, self.max_queue, self.overflow_policy, self._evict)
+        self.active_connections[websocket] = client
+        client.start()
+        logger.info(f"WebSocket connected. Total: {len(self.active_connections)}")
+
+    def disconnect(self, websocket: WebSocket):
+        client = self.active_connections.pop(websocket, None)
+        if client is None:
+            return
+        client.close()
+        logger.info(f"WebSocket disconnected. Total: {len(self.active_connections)}")
+
+    def set_encoder(self, websocket: WebSocket, encoder):
+        """Switch a client's wire format; None restores plain JSON"""
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            client.encoder = encoder
+
+    def enqueue(self, message: Message, websocket: WebSocket, key: Optional[str] = None):
+        """Queue a message for one client without awaiting (safe from loop callbacks)"""
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            client.enqueue(message, key)
+
+    async def send_personal_message(self, message: Message, websocket: WebSocket, key: Optional[str] = None):
+        """Queue a message for one client"""
+        self.enqueue(message, websocket, key)
+
+    def enqueue_broadcast(self, message: Message, key: Optional[str] = None):
+        """Queue a message for every client without awaiting"""
+        for client in list(self.active_connections.values()):
+            client.enqueue(message, key)
+
+    async def broadcast(self, message: Message, key: Optional[str] = None):
+        """Queue a message for every client; O(1) per client regardless of reader speed"""
+        self.enqueue_broadcast(message, key)
+
+    def _evict(self, websocket: WebSocket, close_code: Optional[int] = None):
+        """Drop a dead or slow client and close its socket"""
+        self.disconnect(websocket)
+        if close_code is not None:
+            asyncio.create_task(self._close(websocket, close_code))
+
+    async def _close(self, websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
@@ -0,0 +1,51 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import Tuple
+
+
+def downsample_ohlc(
+    data: pd.DataFrame,
+    max_points: int,
+    bar_seconds: int
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Aggregate OHLCV bars into at most ~max_points candles
+
+    Buckets are aligned to multiples of the bucket duration since the epoch,
+    so a zoomed-in request for a sub-range lines up with the overview and the
+    client can swap in finer detail without candles shifting. Each bucket
+    keeps its first open, true high, true low, last close and summed volume.
+
+    Args:
+        data: DataFrame with columns [timestamp, open, high, low, close, volume]
+        max_points: Target number of candles
+        bar_seconds: Length of one source bar in seconds
+
+    Returns:
+        Tuple of (aggregated DataFrame, bucket duration in seconds)
+    """
+    n = len(data)
+    if max_points <= 0 or n <= max_points:
+        return data, bar_seconds
+
+    bars_per_bucket = math.ceil(n / max_points)
+    bucket_seconds = bar_seconds * bars_per_bucket
+
+    seconds = data['timestamp'].values.astype('datetime64[s]').astype(np.int64)
+    keys = seconds // bucket_seconds
+
+    # Bars are time-ordered, so every bucket is a contiguous run
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    aggregated = pd.DataFrame({
+        'timestamp': pd.to_datetime(keys[starts] * bucket_seconds, unit='s'),
+        'open': data['open'].values[starts],
+        'high': np.maximum.reduceat(data['high'].values, starts),
+        'low': np.minimum.reduceat(data['low'].values, starts),
+        'close': data['close'].values[ends],
+        'volume': np.add.reduceat(data['volume'].values, starts)
+    })
+
+    return aggregated, bucket_seconds
@@ -1,19 +1,61 @@
-from typing import Dict, List
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+# Strategy fields the code below the header depends on; name and description
+# only appear in the header, which is cheap to render on every call
+CODE_FIELDS = ("symbol", "visual_elements", "entry_rules", "exit_rules", "risk_management")
+
+# Generated bodies kept in memory, keyed by code_key
+CODE_CACHE_SIZE = 1024
+
+_body_cache: "OrderedDict[str, str]" = OrderedDict()
+_body_cache_lock = threading.Lock()
+
+
+def code_key(strategy: Dict) -> str:
+    """sha256 of the canonical JSON of the code-affecting fields"""
+    inputs = {field: strategy[field] for field in CODE_FIELDS if field in strategy}
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
 class MQL5Generator:
     """
     Generates pure MQL5 code from visual strategy definitions
     Strictly MT5 compatible - never uses MT4 functions
+
+    Output is deterministic: identical strategies give identical code unless
+    include_timestamp adds the generation time to the header. Everything
+    below the header is memoized by code_key, so saves that leave the
+    code-affecting fields alone only re-render the header.
     """
     
-    def __init__(self, strategy: Dict):
+    def __init__(self, strategy: Dict, include_timestamp: bool = False):
         self.strategy = strategy
+        self.include_timestamp = include_timestamp
         self.code_lines = []
+        self.code = ""
         
     def generate(self) -> str:
         """Generate complete MQL5 Expert Advisor code"""
+        self.code_lines = []
         self._add_header()
+        self.code = "\n".join(self.code_lines) + "\n" + self._body()
+        return self.code
+    
+    def _body(self) -> str:
+        key = code_key(self.strategy)
+        with _body_cache_lock:
+            body = _body_cache.get(key)
+            if body is not None:
+                _body_cache.move_to_end(key)
+                return body
+        
+        self.code_lines = []
         self._add_input_parameters()
         self._add_global_variables()
         self._add_oninit()
@@ -23,8 +65,13 @@ class MQL5Generator:
         self._add_exit_logic()
         self._add_risk_management()
         self._add_utility_functions()
+        body = "\n".join(self.code_lines)
         
-        return "\n".join(self.code_lines)
+        with _body_cache_lock:
+            _body_cache[key] = body
+            while len(_body_cache) > CODE_CACHE_SIZE:
+                _body_cache.popitem(last=False)
+        return body
     
     def _add_header(self):
         """Add EA header and properties"""
@@ -35,7 +82,12 @@ class MQL5Generator:
             "//+------------------------------------------------------------------+",
             f"//| {name:64} |",
             "//| Generated by MQL5 Algo Bot Builder                               |",
-            f"//| {datetime.now().strftime('%Y.%m.%d %H:%M')}                                                    |",
+        ])
+        if self.include_timestamp:
+            self.code_lines.append(
+                f"//| {datetime.now().strftime('%Y.%m.%d %H:%M')}                                                    |"
+            )
+        self.code_lines.extend([
             "//+------------------------------------------------------------------+",
             "#property copyright \"MQL5 Algo Bot Builder\"",
             "#property link      \"https://your-platform.com\"",
@@ -409,4 +461,19 @@ class MQL5Generator:
     
     def get_code(self) -> str:
         """Return generated code"""
-        return "\n".join(self.code_lines)
\ No newline at end of file
+        return self.code
+
+
+def generate_many(strategies: List[Dict]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Generate code for several strategies, returning (code, error) per strategy
+
+    Module level and free of app imports so it can run in a process pool.
+    """
+    results = []
+    for strategy in strategies:
+        try:
+            results.append((MQL5Generator(strategy).generate(), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results
@@ -1,55 +1,207 @@
 import MetaTrader5 as mt5
 from datetime import datetime, timedelta
+import threading
+import time
+import numpy as np
 import pandas as pd
 from typing import Optional, List, Dict
 from loguru import logger
 from config import settings
 
+# Map timeframe strings to MT5 constants
+TIMEFRAME_MAP = {
+    "M1": mt5.TIMEFRAME_M1,
+    "M5": mt5.TIMEFRAME_M5,
+    "M15": mt5.TIMEFRAME_M15,
+    "M30": mt5.TIMEFRAME_M30,
+    "H1": mt5.TIMEFRAME_H1,
+    "H4": mt5.TIMEFRAME_H4,
+    "D1": mt5.TIMEFRAME_D1,
+    "W1": mt5.TIMEFRAME_W1,
+    "MN1": mt5.TIMEFRAME_MN1
+}
+
+# Nominal bar length per timeframe, in seconds
+TIMEFRAME_SECONDS = {
+    "M1": 60,
+    "M5": 300,
+    "M15": 900,
+    "M30": 1800,
+    "H1": 3600,
+    "H4": 14400,
+    "D1": 86400,
+    "W1": 604800,
+    "MN1": 2592000
+}
+
+# Circuit breaker states for the terminal connection
+CIRCUIT_CLOSED = "closed"        # connected, requests go straight through
+CIRCUIT_OPEN = "open"            # terminal down, requests fail fast until the next retry
+CIRCUIT_HALF_OPEN = "half_open"  # a reconnect attempt is in progress
+
 class MT5Service:
     def __init__(self):
         self.connected = False
         self.account_info = None
         
+        # Connection supervision
+        self.circuit_state = CIRCUIT_OPEN
+        self.failure_count = 0
+        self.next_retry_at = 0.0
+        self._lock = threading.RLock()  # also held by bulk readers (see terminal_lock)
+        self._supervisor: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        
+        # Last known good results, served while the terminal is unavailable
+        self._symbols_cache: List[str] = []
+        self._symbol_info_cache: Dict[str, Dict] = {}
+        
+    @property
+    def terminal_lock(self) -> threading.RLock:
+        """
+        Lock serializing access to the process-global MetaTrader5 API
+
+        Held by connection management; callers reading the terminal in bulk
+        from a worker thread hold it too so they never interleave with it.
+        """
+        return self._lock
+    
     def connect(self) -> bool:
         """
         Auto-connect to running MT5 instance (no credentials needed)
         """
         if self.connected:
             return True
+        
+        with self._lock:
+            if self.connected:
+                return True
             
-        try:
-            # Initialize MT5 connection to running instance
-            if not mt5.initialize():
-                logger.error(f"MT5 initialization failed: {mt5.last_error()}")
+            self.circuit_state = CIRCUIT_HALF_OPEN
+            try:
+                # Initialize MT5 connection to running instance
+                if not mt5.initialize():
+                    logger.error(f"MT5 initialization failed: {mt5.last_error()}")
+                    self._record_failure()
+                    return False
+                
+                # Get account info from running instance
+                self.account_info = mt5.account_info()
+                if self.account_info is None:
+                    logger.error("Failed to get account info")
+                    mt5.shutdown()
+                    self._record_failure()
+                    return False
+                
+                self.connected = True
+                self.circuit_state = CIRCUIT_CLOSED
+                self.failure_count = 0
+                logger.info(f"Connected to MT5 - Account: {self.account_info.login}, Server: {self.account_info.server}")
+                return True
+                
+            except Exception as e:
+                logger.error(f"MT5 connection error: {e}")
+                self._record_failure()
                 return False
-            
-            # Get account info from running instance
-            self.account_info = mt5.account_info()
-            if self.account_info is None:
-                logger.error("Failed to get account info")
+    
+    def disconnect(self):
+        """Disconnect from MT5"""
+        with self._lock:
+            if self.connected:
                 mt5.shutdown()
+                self.connected = False
+                self.circuit_state = CIRCUIT_OPEN
+                logger.info("Disconnected from MT5")
+    
+    def _record_failure(self):
+        """Open the circuit and schedule the next reconnect with exponential backoff"""
+        self.connected = False
+        self.failure_count += 1
+        delay = min(
+            settings.MT5_RECONNECT_BASE_DELAY * (2 ** (self.failure_count - 1)),
+            settings.MT5_RECONNECT_MAX_DELAY
+        )
+        self.next_retry_at = time.monotonic() + delay
+        self.circuit_state = CIRCUIT_OPEN
+        logger.warning(f"MT5 unavailable, next reconnect attempt in {delay:.1f}s")
+    
+    def _ensure_connected(self) -> bool:
+        """
+        Check the connection without blocking on the terminal
+        
+        While the supervisor is running, reconnects only ever happen on its
+        thread and requests fail fast. Without a supervisor, a reconnect is
+        attempted inline but only once the backoff delay has elapsed.
+        """
+        if self.connected:
+            return True
+        if self._supervisor is not None and self._supervisor.is_alive():
+            return False
+        if time.monotonic() < self.next_retry_at:
+            return False
+        return self.connect()
+    
+    def _check_health(self) -> bool:
+        """Probe the terminal, opening the circuit if it stopped responding"""
+        with self._lock:
+            if not self.connected:
                 return False
+            try:
+                healthy = mt5.terminal_info() is not None
+            except Exception as e:
+                logger.error(f"MT5 health check error: {e}")
+                healthy = False
             
-            self.connected = True
-            logger.info(f"Connected to MT5 - Account: {self.account_info.login}, Server: {self.account_info.server}")
-            return True
+            if not healthy:
+                logger.warning(f"Lost connection to MT5: {mt5.last_error()}")
+                mt5.shutdown()
+                self._record_failure()
+            return healthy
+    
+    def _supervise(self):
+        """Health loop: probe while connected, reconnect with backoff while not"""
+        while not self._stop_event.is_set():
+            if self.connected:
+                self._check_health()
+                wait = settings.MT5_HEALTH_CHECK_INTERVAL
+            elif time.monotonic() >= self.next_retry_at:
+                self.connect()
+                wait = 0 if self.connected else settings.MT5_HEALTH_CHECK_INTERVAL
+            else:
+                wait = self.next_retry_at - time.monotonic()
             
-        except Exception as e:
-            logger.error(f"MT5 connection error: {e}")
-            return False
+            self._stop_event.wait(min(wait, settings.MT5_HEALTH_CHECK_INTERVAL))
     
-    def disconnect(self):
-        """Disconnect from MT5"""
-        if self.connected:
-            mt5.shutdown()
-            self.connected = False
-            logger.info("Disconnected from MT5")
+    def start_supervisor(self):
+        """Start the background connection supervisor"""
+        if self._supervisor is not None and self._supervisor.is_alive():
+            return
+        self._stop_event.clear()
+        self._supervisor = threading.Thread(target=self._supervise, name="mt5-supervisor", daemon=True)
+        self._supervisor.start()
+        logger.info("MT5 connection supervisor started")
+    
+    def stop_supervisor(self):
+        """Stop the background connection supervisor"""
+        self._stop_event.set()
+        if self._supervisor is not None:
+            self._supervisor.join(timeout=5)
+            self._supervisor = None
+    
+    def get_connection_state(self) -> Dict:
+        """Describe the connection and circuit breaker state"""
+        retry_in = max(0.0, self.next_retry_at - time.monotonic()) if not self.connected else 0.0
+        return {
+            "connected": self.connected,
+            "circuit_state": self.circuit_state,
+            "failure_count": self.failure_count,
+            "retry_in_seconds": round(retry_in, 1)
+        }
     
     def get_account_info(self) -> Optional[Dict]:
         """Get account information"""
-        if not self.connected:
-            if not self.connect():
-                return None
+        if not self._ensure_connected():
+            return None
         
         info = mt5.account_info()
         if info is None:
@@ -70,27 +222,26 @@ class MT5Service:
     
     def get_symbols(self) -> List[str]:
         """Get all available symbols"""
-        if not self.connected:
-            if not self.connect():
-                return []
+        if not self._ensure_connected():
+            return list(self._symbols_cache)
         
         symbols = mt5.symbols_get()
         if symbols is None:
-            return []
+            return list(self._symbols_cache)
         
-        return [s.name for s in symbols if s.visible]
+        self._symbols_cache = [s.name for s in symbols if s.visible]
+        return list(self._symbols_cache)
     
     def get_symbol_info(self, symbol: str) -> Optional[Dict]:
         """Get symbol specifications"""
-        if not self.connected:
-            if not self.connect():
-                return None
+        if not self._ensure_connected():
+            return self._symbol_info_cache.get(symbol)
         
         info = mt5.symbol_info(symbol)
         if info is None:
-            return None
+            return self._symbol_info_cache.get(symbol)
         
-        return {
+        self._symbol_info_cache[symbol] = {
             "name": info.name,
             "digits": info.digits,
             "point": info.point,
@@ -104,6 +255,7 @@ class MT5Service:
             "bid": info.bid,
             "ask": info.ask
         }
+        return self._symbol_info_cache[symbol]
     
     def get_historical_data(
         self,
@@ -115,24 +267,10 @@ class MT5Service:
         """
         Fetch historical OHLCV data from MT5
         """
-        if not self.connected:
-            if not self.connect():
-                return None
-        
-        # Map timeframe strings to MT5 constants
-        timeframe_map = {
-            "M1": mt5.TIMEFRAME_M1,
-            "M5": mt5.TIMEFRAME_M5,
-            "M15": mt5.TIMEFRAME_M15,
-            "M30": mt5.TIMEFRAME_M30,
-            "H1": mt5.TIMEFRAME_H1,
-            "H4": mt5.TIMEFRAME_H4,
-            "D1": mt5.TIMEFRAME_D1,
-            "W1": mt5.TIMEFRAME_W1,
-            "MN1": mt5.TIMEFRAME_MN1
-        }
+        if not self._ensure_connected():
+            return None
         
-        tf = timeframe_map.get(timeframe.upper(), mt5.TIMEFRAME_H1)
+        tf = TIMEFRAME_MAP.get(timeframe.upper(), mt5.TIMEFRAME_H1)
         
         try:
             # Fetch data
@@ -156,11 +294,28 @@ class MT5Service:
             logger.error(f"Error fetching historical data: {e}")
             return None
     
+    def get_latest_bars(self, symbol: str, timeframe: str, count: int = 2) -> Optional[np.ndarray]:
+        """
+        Latest bars as MT5's raw structured array, oldest first
+        The last row is the forming bar
+        """
+        if not self._ensure_connected():
+            return None
+        
+        tf = TIMEFRAME_MAP.get(timeframe.upper(), mt5.TIMEFRAME_H1)
+        try:
+            rates = mt5.copy_rates_from_pos(symbol, tf, 0, count)
+            if rates is None or len(rates) == 0:
+                return None
+            return rates
+        except Exception as e:
+            logger.error(f"Error fetching latest bars for {symbol}: {e}")
+            return None
+    
     def get_tick_data(self, symbol: str, count: int = 1000) -> Optional[pd.DataFrame]:
         """Get recent tick data"""
-        if not self.connected:
-            if not self.connect():
-                return None
+        if not self._ensure_connected():
+            return None
         
         try:
             ticks = mt5.copy_ticks_from(symbol, datetime.now(), count, mt5.COPY_TICKS_ALL)
@@ -179,9 +334,8 @@ class MT5Service:
     
     def get_current_price(self, symbol: str) -> Optional[Dict]:
         """Get current bid/ask prices"""
-        if not self.connected:
-            if not self.connect():
-                return None
+        if not self._ensure_connected():
+            return None
         
         tick = mt5.symbol_info_tick(symbol)
         if tick is None:
@@ -193,7 +347,8 @@ class MT5Service:
             "ask": tick.ask,
             "last": tick.last,
             "volume": tick.volume,
-            "time": datetime.fromtimestamp(tick.time)
+            "time": datetime.fromtimestamp(tick.time),
+            "time_msc": tick.time_msc
         }
     
     def calculate_position_size(
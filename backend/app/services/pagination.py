@@ -0,0 +1,46 @@
+import base64
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import Select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, row_id: uuid.UUID) -> str:
+    """Opaque cursor for the position just after a row"""
+    raw = f"{sort_value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        sort_value, _, row_id = raw.partition("|")
+        return datetime.fromisoformat(sort_value), uuid.UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def keyset_page(query: Select, sort_column, id_column, cursor: Optional[str], limit: int) -> Select:
+    """
+    Order a query newest first by (sort_column, id_column) and start after cursor
+
+    One extra row is fetched so the caller can tell whether a next page exists.
+    The row comparison is answered from a (sort_column DESC, id DESC) index,
+    so every page costs the same however deep it is.
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.where(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+    return query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def split_page(rows: List[Any], limit: int, sort_attr: str) -> Tuple[List[Any], Optional[str]]:
+    """Trim the extra row from keyset_page and build the next cursor"""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_attr), last.id)
@@ -0,0 +1,352 @@
+import asyncio
+from typing import Callable, Dict, List, Optional, Set
+from fastapi import WebSocket
+from loguru import logger
+from config import settings
+from services.mt5_service import mt5_service, TIMEFRAME_SECONDS
+from services.bar_builder import BarBuilder, BAR_UPDATE, BAR_CLOSED, bar_to_message
+
+class PriceSubscription:
+    """
+    One socket's subscription to one symbol
+
+    Ticks arriving faster than max_rate are coalesced: the latest bid/ask is
+    kept along with the bid high/low and tick count over the interval, and
+    sent as a single update once the interval has elapsed.
+    """
+
+    def __init__(self, max_rate: Optional[float] = None):
+        self.set_rate(max_rate)
+        self.last_sent = 0.0
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self._reset()
+
+    def set_rate(self, max_rate):
+        """Use max_rate updates per second; missing, non-numeric or non-positive values get the default"""
+        try:
+            rate = float(max_rate)
+        except (TypeError, ValueError):
+            rate = 0.0
+        if not 0 < rate < float("inf"):
+            rate = settings.PRICE_MAX_UPDATE_RATE
+        self.min_interval = 1.0 / rate
+
+    def add(self, price: Dict):
+        """Fold a tick into the pending interval"""
+        self.pending = price
+        bid = price['bid']
+        self.high = bid if self.high is None else max(self.high, bid)
+        self.low = bid if self.low is None else min(self.low, bid)
+        self.tick_count += 1
+
+    def take(self) -> Optional[Dict]:
+        """Return the coalesced update and start a new interval"""
+        if self.pending is None:
+            return None
+        data = {
+            **self.pending,
+            "high": self.high,
+            "low": self.low,
+            "tick_count": self.tick_count
+        }
+        self._reset()
+        return data
+
+    def cancel(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+    def _reset(self):
+        self.pending: Optional[Dict] = None
+        self.high: Optional[float] = None
+        self.low: Optional[float] = None
+        self.tick_count = 0
+
+
+class PriceStreamHub:
+    """
+    Push-based price and live bar subscriptions for /ws
+
+    Runs a single producer task per subscribed symbol that reads ticks once
+    and fans them out to every subscribed socket. A producer starts with the
+    first subscriber and stops when the last one leaves, so terminal load
+    scales with the number of distinct symbols, not connected clients. The
+    same ticks feed a BarBuilder that pushes forming and closed candles.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.subscribers: Dict[str, Dict[WebSocket, PriceSubscription]] = {}
+        self.bar_subscribers: Dict[str, Dict[WebSocket, Set[str]]] = {}
+        self.producers: Dict[str, Optional[asyncio.Task]] = {}
+        self.latest: Dict[str, Dict] = {}
+        self.bar_builder = BarBuilder()
+        # Server-side consumers: symbols kept live without a socket, and closed-bar callbacks
+        self.retained: Dict[str, int] = {}
+        self.bar_listeners: List[Callable[[str, str, Dict], None]] = []
+        # Optional shared tick source replacing per-symbol terminal polling
+        self.tick_board = None
+
+    async def subscribe(self, websocket: WebSocket, symbol: str, max_rate: Optional[float] = None):
+        """Subscribe a socket to a symbol's price updates, at most max_rate per second"""
+        subscribers = self.subscribers.setdefault(symbol, {})
+        subscription = subscribers.get(websocket)
+        if subscription is not None:
+            subscription.set_rate(max_rate)
+        else:
+            subscription = subscribers[websocket] = PriceSubscription(max_rate)
+
+        self._start_producer(symbol)
+
+        # New subscribers get the last known price right away
+        if symbol in self.latest:
+            subscription.add(self.latest[symbol])
+            self._flush(symbol, websocket)
+
+    async def unsubscribe(self, websocket: WebSocket, symbol: str):
+        """Remove a socket's price subscription for a symbol"""
+        subscribers = self.subscribers.get(symbol)
+        if subscribers is None:
+            return
+
+        subscription = subscribers.pop(websocket, None)
+        if subscription is not None:
+            subscription.cancel()
+        if not subscribers:
+            del self.subscribers[symbol]
+        self._stop_producer_if_idle(symbol)
+
+    async def subscribe_bars(self, websocket: WebSocket, symbol: str, timeframes: List[str]):
+        """Subscribe a socket to live bar_update/bar_closed events for some timeframes"""
+        timeframes = [tf.upper() for tf in timeframes if tf.upper() in TIMEFRAME_SECONDS]
+        if not timeframes:
+            return
+
+        self.bar_subscribers.setdefault(symbol, {}).setdefault(websocket, set()).update(timeframes)
+        self._start_producer(symbol)
+
+        # Send the forming bar so the chart can join mid-bar
+        for timeframe in timeframes:
+            bar = self.bar_builder.forming_bar(symbol, timeframe)
+            if bar is not None:
+                self.manager.enqueue(
+                    self._bar_message(BAR_UPDATE, symbol, timeframe, bar),
+                    websocket,
+                    f"{BAR_UPDATE}:{symbol}:{timeframe}"
+                )
+
+    async def unsubscribe_bars(self, websocket: WebSocket, symbol: str):
+        """Remove a socket's bar subscription for a symbol"""
+        subscribers = self.bar_subscribers.get(symbol)
+        if subscribers is None:
+            return
+
+        subscribers.pop(websocket, None)
+        if not subscribers:
+            del self.bar_subscribers[symbol]
+        self._stop_producer_if_idle(symbol)
+
+    async def unsubscribe_all(self, websocket: WebSocket):
+        """Drop every subscription held by a socket"""
+        for symbol in [s for s, subs in self.subscribers.items() if websocket in subs]:
+            await self.unsubscribe(websocket, symbol)
+        for symbol in [s for s, subs in self.bar_subscribers.items() if websocket in subs]:
+            await self.unsubscribe_bars(websocket, symbol)
+
+    def retain(self, symbol: str):
+        """Keep a symbol's producer running for a server-side consumer"""
+        self.retained[symbol] = self.retained.get(symbol, 0) + 1
+        self._start_producer(symbol)
+
+    def release(self, symbol: str):
+        """Undo one retain()"""
+        count = self.retained.get(symbol, 0) - 1
+        if count > 0:
+            self.retained[symbol] = count
+            return
+        self.retained.pop(symbol, None)
+        self._stop_producer_if_idle(symbol)
+
+    def add_bar_listener(self, listener: Callable[[str, str, Dict], None]):
+        """Register a callback(symbol, timeframe, bar) for every closed bar"""
+        self.bar_listeners.append(listener)
+
+    def remove_bar_listener(self, listener: Callable[[str, str, Dict], None]):
+        if listener in self.bar_listeners:
+            self.bar_listeners.remove(listener)
+
+    async def attach_tick_board(self, client):
+        """
+        Read live ticks from the shared-memory tick board instead of the terminal
+
+        Used when several workers run behind one MT5 reader process; the
+        client's subscriptions replace this process's producer tasks.
+        """
+        self.tick_board = client
+        await client.start()
+
+    def _start_producer(self, symbol: str):
+        if symbol in self.producers:
+            return
+        if self.tick_board is not None:
+            self.producers[symbol] = None
+            self.tick_board.subscribe(symbol)
+        else:
+            self.producers[symbol] = asyncio.create_task(self._produce(symbol))
+        logger.info(f"Started price producer for {symbol}")
+
+    def on_board_tick(self, symbol: str, price: Dict):
+        """Tick board callback"""
+        if symbol in self.producers:
+            self._publish(symbol, price)
+
+    def _stop_producer_if_idle(self, symbol: str):
+        if symbol in self.subscribers or symbol in self.bar_subscribers or symbol in self.retained:
+            return
+        self.latest.pop(symbol, None)
+        self.bar_builder.reset(symbol)
+        if symbol not in self.producers:
+            return
+        producer = self.producers.pop(symbol)
+        if producer is not None:
+            producer.cancel()
+        if self.tick_board is not None:
+            self.tick_board.unsubscribe(symbol)
+        logger.info(f"Stopped price producer for {symbol}")
+
+    async def shutdown(self):
+        """Cancel all producers"""
+        for producer in self.producers.values():
+            if producer is not None:
+                producer.cancel()
+        if self.tick_board is not None:
+            await self.tick_board.stop()
+            self.tick_board = None
+        for subscribers in self.subscribers.values():
+            for subscription in subscribers.values():
+                subscription.cancel()
+        self.producers.clear()
+        self.subscribers.clear()
+        self.bar_subscribers.clear()
+        self.retained.clear()
+        self.latest.clear()
+
+    async def _produce(self, symbol: str):
+        """Poll the terminal for one symbol and publish each new tick"""
+        last_tick: Optional[int] = None
+        digits: Optional[int] = None
+
+        try:
+            for timeframe, rate in (await asyncio.to_thread(self._read_forming_bars, symbol)).items():
+                self.bar_builder.seed(symbol, timeframe, rate)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Seeding bars for {symbol} failed, first bars stay partial: {e}")
+
+        while True:
+            try:
+                if digits is None:
+                    info = await asyncio.to_thread(mt5_service.get_symbol_info, symbol)
+                    digits = info['digits'] if info else None
+
+                price = await asyncio.to_thread(mt5_service.get_current_price, symbol)
+                if price and price['time_msc'] != last_tick:
+                    last_tick = price['time_msc']
+                    self._publish(symbol, {
+                        **price,
+                        "time": price['time'].isoformat(),
+                        "digits": digits  # None until the symbol info has been read
+                    })
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Price producer error for {symbol}: {e}")
+
+            await asyncio.sleep(settings.PRICE_POLL_INTERVAL)
+
+    def _read_forming_bars(self, symbol: str) -> Dict[str, Dict]:
+        """The terminal's forming bar per timeframe, to seed the bar builder (blocking)"""
+        forming = {}
+        for timeframe in self.bar_builder.timeframes:
+            rates = mt5_service.get_latest_bars(symbol, timeframe, 1)
+            if rates is None or len(rates) == 0:
+                continue
+            rate = rates[-1]
+            forming[timeframe] = {
+                'time': int(rate['time']),
+                'open': float(rate['open']),
+                'high': float(rate['high']),
+                'low': float(rate['low']),
+                'close': float(rate['close']),
+                'volume': int(rate['tick_volume'])
+            }
+        return forming
+
+    def _publish(self, symbol: str, price: Dict):
+        """Fold a tick into every subscription, sending those whose interval has elapsed"""
+        self.latest[symbol] = price
+        self._publish_bars(symbol, price)
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        for websocket, subscription in list(self.subscribers.get(symbol, {}).items()):
+            subscription.add(price)
+            if subscription.flush_handle is not None:
+                continue
+            wait = subscription.last_sent + subscription.min_interval - now
+            if wait <= 0:
+                self._flush(symbol, websocket)
+            else:
+                subscription.flush_handle = loop.call_later(wait, self._flush, symbol, websocket)
+
+    def _flush(self, symbol: str, websocket: WebSocket):
+        """Send a subscription's coalesced update"""
+        subscription = self.subscribers.get(symbol, {}).get(websocket)
+        if subscription is None:
+            return
+        subscription.flush_handle = None
+
+        data = subscription.take()
+        if data is None:
+            return
+        subscription.last_sent = asyncio.get_running_loop().time()
+        self.manager.enqueue({"type": "price_update", "data": data}, websocket, f"price_update:{symbol}")
+
+    def _publish_bars(self, symbol: str, price: Dict):
+        """Feed the bar builder and push its events to bar subscribers"""
+        events = self.bar_builder.on_tick(symbol, price)
+
+        for event, timeframe, bar in events:
+            if event != BAR_CLOSED:
+                continue
+            for listener in self.bar_listeners:
+                try:
+                    listener(symbol, timeframe, bar)
+                except Exception as e:
+                    logger.error(f"Bar listener error for {symbol} {timeframe}: {e}")
+
+        subscribers = self.bar_subscribers.get(symbol)
+        if not subscribers:
+            return
+
+        for event, timeframe, bar in events:
+            message = None
+            for websocket, timeframes in list(subscribers.items()):
+                if timeframe not in timeframes:
+                    continue
+                if message is None:
+                    message = self._bar_message(event, symbol, timeframe, bar)
+                # Forming-bar updates may be conflated; closed bars never are
+                key = f"{BAR_UPDATE}:{symbol}:{timeframe}" if event == BAR_UPDATE else None
+                self.manager.enqueue(message, websocket, key)
+
+    def _bar_message(self, event: str, symbol: str, timeframe: str, bar: Dict) -> Dict:
+        return {
+            "type": event,
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "data": bar_to_message(bar)
+        }
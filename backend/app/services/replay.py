@@ -0,0 +1,328 @@
+import asyncio
+import uuid
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi import WebSocket
+from loguru import logger
+from config import settings
+from database import SessionLocal, Strategy
+from services.bar_builder import bar_to_message
+from services.bar_cache import bar_cache
+from services.mt5_service import TIMEFRAME_SECONDS
+from services.signal_engine import LevelIndex
+
+REPLAY_LOADING = "loading"
+REPLAY_PLAYING = "playing"
+REPLAY_PAUSED = "paused"
+REPLAY_FINISHED = "finished"
+
+
+class ReplaySession:
+    """
+    One client's accelerated replay of a historical range
+
+    Pacing is in bars: at speed 1 a bar is released every bar duration, at
+    speed 600 an M1 replay releases ten bars per second. Market closures are
+    skipped rather than waited out. Every REPLAY_BATCH_INTERVAL the bars that
+    became due go out in one replay_bars message, together with the signals
+    any overlaid strategy would have produced on them.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        websocket: WebSocket,
+        manager,
+        symbol: str,
+        timeframe: str,
+        start_date: datetime,
+        end_date: datetime,
+        speed: float,
+        strategy_ids: List[str]
+    ):
+        self.session_id = session_id
+        self.websocket = websocket
+        self.manager = manager
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.start_date = start_date
+        self.end_date = end_date
+        self.speed = speed
+        self.strategy_ids = strategy_ids
+        self.bar_seconds = TIMEFRAME_SECONDS[timeframe]
+
+        self.state = REPLAY_LOADING
+        self.position = 0
+        self.budget = 0.0  # market seconds earned but not yet released
+        self.levels: Optional[LevelIndex] = None
+        self.times = self.open = self.high = self.low = self.close = self.volume = None
+        self.task: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return 0 if self.times is None else len(self.times)
+
+    def start(self):
+        self._send_state()
+        self.task = asyncio.create_task(self._run())
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def pause(self):
+        if self.state == REPLAY_PLAYING:
+            self.state = REPLAY_PAUSED
+            self._send_state()
+
+    def resume(self):
+        if self.state == REPLAY_PAUSED:
+            self.state = REPLAY_PLAYING
+            self._send_state()
+
+    def set_speed(self, speed: float):
+        self.speed = speed
+        self._send_state()
+
+    def seek(self, when: datetime):
+        """Jump to the first bar at or after when"""
+        epoch = int((when - datetime(1970, 1, 1)).total_seconds())
+        self.position = int(np.searchsorted(self.times, epoch, side='left'))
+        self.budget = 0.0
+        if self.state == REPLAY_FINISHED:
+            # Seeking back into the range restarts playback
+            self.state = REPLAY_PAUSED
+            self.task = asyncio.create_task(self._play())
+        self._send_state()
+
+    def _load(self):
+        """Read the bars and the overlaid strategies (blocking)"""
+        data = bar_cache.get_bars(self.symbol, self.timeframe, self.start_date, self.end_date)
+        if data is None or len(data) == 0:
+            raise ValueError(f"No data available for {self.symbol} {self.timeframe}")
+
+        self.times = data['timestamp'].values.astype('datetime64[s]').astype(np.int64)
+        self.open = data['open'].to_numpy(dtype=np.float64)
+        self.high = data['high'].to_numpy(dtype=np.float64)
+        self.low = data['low'].to_numpy(dtype=np.float64)
+        self.close = data['close'].to_numpy(dtype=np.float64)
+        self.volume = data['volume'].to_numpy(dtype=np.int64)
+
+        if not self.strategy_ids:
+            return
+        db = SessionLocal()
+        try:
+            rows = db.query(Strategy.id, Strategy.visual_elements).filter(
+                Strategy.id.in_(self.strategy_ids)
+            ).all()
+        finally:
+            db.close()
+
+        self.levels = LevelIndex()
+        for row in rows:
+            self.levels.add(str(row.id), row.visual_elements or [])
+
+    async def _run(self):
+        try:
+            await asyncio.to_thread(self._load)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Replay {self.session_id} failed to load: {e}")
+            self.state = REPLAY_FINISHED
+            self._send({"type": "replay_error", "session_id": self.session_id, "message": str(e)})
+            return
+
+        self.state = REPLAY_PLAYING
+        self._send({
+            "type": "replay_started",
+            "session_id": self.session_id,
+            "symbol": self.symbol,
+            "timeframe": self.timeframe,
+            "total_bars": len(self),
+            "start": bar_to_message(self._bar(0))['timestamp'],
+            "end": bar_to_message(self._bar(len(self) - 1))['timestamp'],
+            "speed": self.speed
+        })
+        await self._play()
+
+    async def _play(self):
+        interval = settings.REPLAY_BATCH_INTERVAL
+        max_budget = self.bar_seconds * settings.REPLAY_MAX_BATCH
+
+        while self.position < len(self):
+            await asyncio.sleep(interval)
+            if self.state != REPLAY_PLAYING:
+                continue
+
+            # Never bank more than one batch, so a stalled loop does not burst
+            self.budget = min(self.budget + interval * self.speed, max_budget)
+            count = int(self.budget // self.bar_seconds)
+            if count == 0:
+                continue
+            self.budget -= count * self.bar_seconds
+            self._send_batch(self.position, min(self.position + count, len(self)))
+
+        self.state = REPLAY_FINISHED
+        self.task = None
+        self._send({"type": "replay_finished", "session_id": self.session_id, "position": self.position})
+
+    def _bar(self, i: int) -> Dict:
+        return {
+            'time': int(self.times[i]),
+            'open': float(self.open[i]),
+            'high': float(self.high[i]),
+            'low': float(self.low[i]),
+            'close': float(self.close[i]),
+            'volume': int(self.volume[i])
+        }
+
+    def _send_batch(self, start: int, stop: int):
+        bars, signals = [], []
+        for i in range(start, stop):
+            bar = bar_to_message(self._bar(i))
+            bars.append(bar)
+            if self.levels is not None:
+                prev_close = self.close[i - 1] if i > 0 else self.open[i]
+                for hit in self.levels.crossed(float(prev_close), float(self.close[i])):
+                    signals.append({**hit, "price": bar['close'], "bar_time": bar['timestamp']})
+
+        self.position = stop
+        self._send({
+            "type": "replay_bars",
+            "session_id": self.session_id,
+            "position": stop,
+            "bars": bars,
+            "signals": signals
+        })
+
+    def _send_state(self):
+        self._send({
+            "type": "replay_state",
+            "session_id": self.session_id,
+            "state": self.state,
+            "position": self.position,
+            "speed": self.speed
+        })
+
+    def _send(self, message: Dict):
+        self.manager.enqueue(message, self.websocket)
+
+
+class ReplayManager:
+    """Replay sessions per /ws client"""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.sessions: Dict[WebSocket, Dict[str, ReplaySession]] = {}
+
+    async def start(self, websocket: WebSocket, message: Dict):
+        """Handle replay_start: validate, then load and play in the background"""
+        try:
+            symbol = message['symbol']
+            timeframe = message.get('timeframe', 'M1').upper()
+            if timeframe not in TIMEFRAME_SECONDS:
+                raise ValueError(f"Invalid timeframe: {timeframe}")
+            start_date = datetime.fromisoformat(message['start'])
+            end_date = datetime.fromisoformat(message['end']) if message.get('end') else datetime.now()
+            if start_date >= end_date:
+                raise ValueError("start must be before end")
+            speed = self._speed(message.get('speed', 1.0))
+        except (KeyError, TypeError, ValueError) as e:
+            await self._error(websocket, f"Invalid replay_start: {e}")
+            return
+
+        sessions = self.sessions.setdefault(websocket, {})
+        self._release_finished(sessions)
+        if len(sessions) >= settings.REPLAY_MAX_SESSIONS:
+            await self._error(websocket, f"At most {settings.REPLAY_MAX_SESSIONS} replay sessions per connection")
+            return
+
+        strategy_ids = message.get('strategy_ids') or ([message['strategy_id']] if message.get('strategy_id') else [])
+        session = ReplaySession(
+            str(uuid.uuid4()), websocket, self.manager,
+            symbol, timeframe, start_date, end_date, speed, strategy_ids
+        )
+        sessions[session.session_id] = session
+        session.start()
+
+    async def pause(self, websocket: WebSocket, message: Dict):
+        session = await self._session(websocket, message)
+        if session is not None:
+            session.pause()
+
+    async def resume(self, websocket: WebSocket, message: Dict):
+        session = await self._session(websocket, message)
+        if session is not None:
+            session.resume()
+
+    async def seek(self, websocket: WebSocket, message: Dict):
+        session = await self._session(websocket, message, ready=True)
+        if session is None:
+            return
+        try:
+            session.seek(datetime.fromisoformat(message['time']))
+        except (KeyError, TypeError, ValueError) as e:
+            await self._error(websocket, f"Invalid replay_seek: {e}")
+
+    async def set_speed(self, websocket: WebSocket, message: Dict):
+        session = await self._session(websocket, message)
+        if session is None:
+            return
+        try:
+            session.set_speed(self._speed(message['speed']))
+        except (KeyError, TypeError, ValueError) as e:
+            await self._error(websocket, f"Invalid replay_speed: {e}")
+
+    async def stop(self, websocket: WebSocket, message: Dict):
+        session = await self._session(websocket, message)
+        if session is not None:
+            session.cancel()
+            del self.sessions[websocket][session.session_id]
+            await self.manager.send_personal_message({
+                "type": "replay_stopped",
+                "session_id": session.session_id,
+                "position": session.position
+            }, websocket)
+
+    async def stop_all(self, websocket: WebSocket):
+        """Cancel every session of a disconnecting client"""
+        for session in self.sessions.pop(websocket, {}).values():
+            session.cancel()
+
+    async def shutdown(self):
+        for websocket in list(self.sessions):
+            await self.stop_all(websocket)
+
+    def _release_finished(self, sessions: Dict[str, ReplaySession]):
+        """Free the slots of sessions that failed to load, then of finished ones if at the limit"""
+        for session_id, session in list(sessions.items()):
+            if session.state == REPLAY_FINISHED and not len(session):
+                del sessions[session_id]
+        # Finished sessions stay seekable until their slot is needed, oldest first
+        for session_id, session in list(sessions.items()):
+            if len(sessions) < settings.REPLAY_MAX_SESSIONS:
+                break
+            if session.state == REPLAY_FINISHED:
+                session.cancel()
+                del sessions[session_id]
+                session._send({"type": "replay_stopped", "session_id": session_id, "position": session.position})
+
+    def _speed(self, value) -> float:
+        speed = float(value)
+        if not 0 < speed <= settings.REPLAY_MAX_SPEED:
+            raise ValueError(f"speed must be in (0, {settings.REPLAY_MAX_SPEED}]")
+        return speed
+
+    async def _session(self, websocket: WebSocket, message: Dict, ready: bool = False) -> Optional[ReplaySession]:
+        session = self.sessions.get(websocket, {}).get(message.get('session_id'))
+        if session is None:
+            await self._error(websocket, f"Unknown replay session: {message.get('session_id')}")
+        elif ready and not len(session):
+            await self._error(websocket, "Replay session has no bars loaded")
+            return None
+        return session
+
+    async def _error(self, websocket: WebSocket, text: str):
+        await self.manager.send_personal_message({"type": "error", "message": text}, websocket)
@@ -0,0 +1,228 @@
+import difflib
+import hashlib
+import json
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import ContentBlob, Strategy, StrategyRevision
+
+BLOB_FULL = "full"
+BLOB_DELTA = "delta"
+
+# Strategy fields captured in a revision snapshot
+SNAPSHOT_FIELDS = (
+    "name", "description", "symbol", "timeframe",
+    "visual_elements", "entry_rules", "exit_rules", "risk_management"
+)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def snapshot_text(strategy: Strategy) -> str:
+    """Canonical JSON of a strategy's definition; equal definitions give equal text"""
+    return _canonical({field: getattr(strategy, field) for field in SNAPSHOT_FIELDS})
+
+
+def _canonical(snapshot: Dict) -> str:
+    return json.dumps(snapshot, sort_keys=True, indent=2, ensure_ascii=False)
+
+
+def make_delta(base: str, target: str) -> List:
+    """Line delta turning base into target: ["c", i, j] copies base lines i:j, ["i", lines] inserts"""
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["c", i1, i2])
+        elif j2 > j1:
+            ops.append(["i", target_lines[j1:j2]])
+    return ops
+
+
+def apply_delta(base: str, ops: List) -> str:
+    base_lines = base.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if op[0] == "c":
+            parts.extend(base_lines[op[1]:op[2]])
+        else:
+            parts.extend(op[1])
+    return "".join(parts)
+
+
+class RevisionStore:
+    """
+    Content-addressed storage for strategy revisions
+
+    Snapshots and generated code are stored as blobs keyed by the sha256 of
+    their text, so an unchanged snapshot or identical code is stored once no
+    matter how many revisions point at it. A new blob is written as a line
+    delta against the previous revision's blob when that is smaller, with
+    chains capped at REVISION_MAX_DELTA_CHAIN. Reconstructed texts are
+    immutable and kept in an LRU cache.
+    """
+
+    def __init__(self, cache_size: int = settings.REVISION_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[str, str]" = OrderedDict()
+
+    async def record(self, db: AsyncSession, strategy: Strategy, commit_message: Optional[str] = None) -> StrategyRevision:
+        """Add a revision for the strategy's current state to the session (caller commits)"""
+        previous = await db.scalar(
+            select(StrategyRevision)
+            .where(StrategyRevision.strategy_id == strategy.id)
+            .order_by(StrategyRevision.version.desc())
+            .limit(1)
+        )
+
+        snapshot_hash = await self.put(db, snapshot_text(strategy), previous.snapshot_hash if previous else None)
+        code_hash = await self.put(db, strategy.mql5_code or "", previous.code_hash if previous else None)
+
+        revision = StrategyRevision(
+            strategy_id=strategy.id,
+            version=strategy.version,
+            snapshot_hash=snapshot_hash,
+            code_hash=code_hash,
+            commit_message=commit_message
+        )
+        db.add(revision)
+        return revision
+
+    async def record_many(self, db: AsyncSession, strategies: List[Dict], commit_message: Optional[str] = None):
+        """
+        Add the first revision of many new strategies (caller commits)
+
+        Strategies are plain dicts with id, version, the snapshot fields and
+        mql5_code. New strategies have no previous blob to delta against, so
+        everything is written whole: one lookup for known hashes, then one
+        insert for the missing blobs and one for the revisions.
+        """
+        texts: Dict[str, str] = {}
+        revisions = []
+        for strategy in strategies:
+            snapshot = _canonical({field: strategy.get(field) for field in SNAPSHOT_FIELDS})
+            code = strategy.get("mql5_code") or ""
+            snapshot_hash, code_hash = content_hash(snapshot), content_hash(code)
+            texts[snapshot_hash] = snapshot
+            texts[code_hash] = code
+            revisions.append({
+                "strategy_id": strategy["id"],
+                "version": strategy["version"],
+                "snapshot_hash": snapshot_hash,
+                "code_hash": code_hash,
+                "commit_message": commit_message
+            })
+        if not revisions:
+            return
+
+        known = set((await db.scalars(select(ContentBlob.hash).where(ContentBlob.hash.in_(list(texts))))).all())
+        blobs = [
+            {
+                "hash": digest, "kind": BLOB_FULL, "base_hash": None, "depth": 0,
+                "size": len(text), "data": zlib.compress(text.encode(), 6)
+            }
+            for digest, text in texts.items()
+            if digest not in known
+        ]
+        if blobs:
+            await db.execute(insert(ContentBlob.__table__).on_conflict_do_nothing(index_elements=["hash"]), blobs)
+        await db.execute(insert(StrategyRevision.__table__), revisions)
+
+    async def put(self, db: AsyncSession, text: str, base_hash: Optional[str] = None) -> str:
+        """Store text unless a blob with the same content exists; returns its hash"""
+        digest = content_hash(text)
+        if await db.scalar(select(ContentBlob.hash).where(ContentBlob.hash == digest)):
+            return digest
+
+        full = zlib.compress(text.encode(), 6)
+        values = {"hash": digest, "kind": BLOB_FULL, "base_hash": None, "depth": 0, "size": len(text), "data": full}
+
+        if base_hash is not None:
+            base = await db.scalar(select(ContentBlob.depth).where(ContentBlob.hash == base_hash))
+            if base is not None and base < settings.REVISION_MAX_DELTA_CHAIN:
+                ops = make_delta(await self.get(db, base_hash), text)
+                delta = zlib.compress(json.dumps(ops, separators=(",", ":")).encode(), 6)
+                if len(delta) < len(full):
+                    values.update(kind=BLOB_DELTA, base_hash=base_hash, depth=base + 1, data=delta)
+
+        await db.execute(insert(ContentBlob).values(**values).on_conflict_do_nothing(index_elements=["hash"]))
+        self._remember(digest, text)
+        return digest
+
+    async def get(self, db: AsyncSession, digest: str) -> str:
+        """Text of a blob, following delta chains"""
+        text = self.cache.get(digest)
+        if text is not None:
+            self.cache.move_to_end(digest)
+            return text
+
+        # Walk down to the nearest full or cached blob, then apply deltas back up
+        chain: List[Tuple[str, List]] = []
+        current = digest
+        while True:
+            cached = self.cache.get(current)
+            if cached is not None:
+                text = cached
+                break
+            blob = (await db.execute(
+                select(ContentBlob.kind, ContentBlob.base_hash, ContentBlob.data).where(ContentBlob.hash == current)
+            )).first()
+            if blob is None:
+                raise KeyError(f"Missing content blob {current}")
+            raw = zlib.decompress(blob.data).decode()
+            if blob.kind == BLOB_FULL:
+                text = raw
+                break
+            chain.append((current, json.loads(raw)))
+            current = blob.base_hash
+
+        self._remember(current, text)
+        for blob_hash, ops in reversed(chain):
+            text = apply_delta(text, ops)
+            self._remember(blob_hash, text)
+        return text
+
+    async def load_revision(self, db: AsyncSession, revision: StrategyRevision) -> Dict:
+        """Snapshot and code of a revision"""
+        return {
+            "version": revision.version,
+            "snapshot": json.loads(await self.get(db, revision.snapshot_hash)),
+            "mql5_code": await self.get(db, revision.code_hash),
+            "commit_message": revision.commit_message,
+            "created_at": revision.created_at.isoformat()
+        }
+
+    async def diff(self, db: AsyncSession, old: StrategyRevision, new: StrategyRevision) -> Dict:
+        """Unified diffs of snapshot and code between two revisions"""
+        result = {}
+        for field, label in (("snapshot_hash", "snapshot"), ("code_hash", "mql5_code")):
+            old_hash, new_hash = getattr(old, field), getattr(new, field)
+            if old_hash == new_hash:
+                # Same content address: nothing to reconstruct or compare
+                result[label] = ""
+                continue
+            result[label] = "".join(difflib.unified_diff(
+                (await self.get(db, old_hash)).splitlines(keepends=True),
+                (await self.get(db, new_hash)).splitlines(keepends=True),
+                fromfile=f"v{old.version}/{label}",
+                tofile=f"v{new.version}/{label}"
+            ))
+        return result
+
+    def _remember(self, digest: str, text: str):
+        self.cache[digest] = text
+        self.cache.move_to_end(digest)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+
+# Singleton instance
+revision_store = RevisionStore()
@@ -0,0 +1,181 @@
+import asyncio
+import math
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+from config import settings
+from services.mt5_service import mt5_service
+
+class MarketScanner:
+    """
+    Evaluates a strategy's entry logic across many symbols at once
+
+    The MetaTrader5 API is process-global, so latest bars are read in
+    batches on a single reader thread under the terminal lock. The last
+    closed close of every symbol is stacked into one array, which is split
+    into chunks evaluated in parallel on a thread pool: each visual element is
+    evaluated against a whole chunk in a single vectorized step. Entry
+    semantics follow BacktestEngine._check_entry: the first element whose
+    condition holds decides the signal.
+    """
+
+    def __init__(self, max_workers: int = settings.SCANNER_WORKERS, batch_size: int = settings.SCANNER_BATCH_SIZE):
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scanner-mt5")
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scanner")
+
+    async def scan(
+        self,
+        visual_elements: List[Dict],
+        timeframe: str,
+        symbols: List[str]
+    ) -> Dict:
+        """
+        Scan symbols for a strategy's entry conditions
+
+        Returns:
+            Dictionary with every scanned symbol ranked by relative distance to
+            trigger (0 when the condition is met) and the symbols that failed to load
+        """
+        closes, loaded, failed = await self._read_closes(symbols, timeframe)
+        if not loaded:
+            return {"results": [], "failed": failed}
+
+        signals, distances = await self._evaluate_parallel(self._conditions(visual_elements), closes)
+
+        order = np.argsort(distances, kind="stable")
+        results = [
+            {
+                "symbol": loaded[i],
+                "close": float(closes[i]),
+                "triggered": signals[i] is not None,
+                "signal": signals[i],
+                "distance": float(distances[i])
+            }
+            for i in order
+            if np.isfinite(distances[i])
+        ]
+        return {"results": results, "failed": failed}
+
+    async def _read_closes(self, symbols: List[str], timeframe: str) -> Tuple[np.ndarray, List[str], List[str]]:
+        """Read the last closed bar of every symbol, one batch at a time on the reader thread"""
+        loop = asyncio.get_running_loop()
+        batches = [symbols[i:i + self.batch_size] for i in range(0, len(symbols), self.batch_size)]
+        batch_results = await asyncio.gather(*[
+            loop.run_in_executor(self.reader, self._read_batch, batch, timeframe)
+            for batch in batches
+        ])
+
+        closes, loaded, failed = [], [], []
+        for batch in batch_results:
+            for symbol, close in batch:
+                if close is None:
+                    failed.append(symbol)
+                else:
+                    loaded.append(symbol)
+                    closes.append(close)
+        return np.array(closes, dtype=np.float64), loaded, failed
+
+    def _read_batch(self, symbols: List[str], timeframe: str) -> List[Tuple[str, Optional[float]]]:
+        results = []
+        with mt5_service.terminal_lock:
+            for symbol in symbols:
+                rates = mt5_service.get_latest_bars(symbol, timeframe, 2)
+                # Rows are [last closed, forming]; entries are decided on the closed bar
+                close = float(rates['close'][-2]) if rates is not None and len(rates) >= 2 else None
+                # A missing or non-positive close cannot be ranked by relative distance
+                results.append((symbol, close if close is not None and close > 0 else None))
+        return results
+
+    def _conditions(self, visual_elements: List[Dict]) -> List[Tuple[str, str, float, float]]:
+        """
+        Entry conditions as (type, action, lower, upper); a line has lower == upper
+
+        Elements are free-form JSON, so malformed ones (missing or non-numeric
+        prices) are logged and skipped, like the signal engine does.
+        """
+        conditions = []
+        for position, element in enumerate(visual_elements or []):
+            try:
+                action = element.get('action', '')
+                if element.get('type') == 'horizontal_line' and action in ('buy_above', 'sell_below'):
+                    price = _price(element['price'])
+                    conditions.append(('horizontal_line', action, price, price))
+                elif element.get('type') == 'zone' and action in ('buy_in_zone', 'sell_in_zone'):
+                    conditions.append(('zone', action, _price(element['lower']), _price(element['upper'])))
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Scanner: skipping visual element {position} ({e!r})")
+        return conditions
+
+    async def _evaluate_parallel(self, conditions: List[Tuple], closes: np.ndarray) -> Tuple[List[Optional[str]], np.ndarray]:
+        """_evaluate over chunks of at least batch_size symbols, one chunk per worker"""
+        loop = asyncio.get_running_loop()
+        chunks = max(1, min(self.max_workers, len(closes) // self.batch_size))
+        parts = await asyncio.gather(*[
+            loop.run_in_executor(self.executor, self._evaluate, conditions, chunk)
+            for chunk in np.array_split(closes, chunks)
+        ])
+        signals = [signal for part_signals, _ in parts for signal in part_signals]
+        return signals, np.concatenate([distances for _, distances in parts])
+
+    def _evaluate(self, conditions: List[Tuple], closes: np.ndarray) -> Tuple[List[Optional[str]], np.ndarray]:
+        """
+        Evaluate every condition against all closes
+
+        Returns:
+            Per-symbol signal ('buy', 'sell' or None) and relative distance to trigger
+        """
+        n = len(closes)
+        triggered_rows, distance_rows, element_signals = [], [], []
+
+        # Distances are relative to the close; a zero close has none
+        priced = closes > 0
+        for kind, action, lower, upper in conditions:
+            if kind == 'horizontal_line':
+                price = lower
+                if action == 'buy_above':
+                    triggered = closes > price
+                    gap = price - closes
+                else:
+                    triggered = closes < price
+                    gap = closes - price
+                signal = 'buy' if action == 'buy_above' else 'sell'
+
+            else:
+                triggered = (closes >= lower) & (closes <= upper)
+                gap = np.maximum(lower - closes, closes - upper)
+                signal = 'buy' if action == 'buy_in_zone' else 'sell'
+
+            triggered_rows.append(triggered)
+            relative = np.divide(np.maximum(gap, 0.0), closes, out=np.full(n, np.inf), where=priced)
+            distance_rows.append(np.where(triggered, 0.0, relative))
+            element_signals.append(signal)
+
+        if not triggered_rows:
+            return [None] * n, np.full(n, np.inf)
+
+        triggered = np.vstack(triggered_rows)
+        distances = np.vstack(distance_rows).min(axis=0)
+
+        # First triggered element per symbol, like the backtest engine
+        first = triggered.argmax(axis=0)
+        any_triggered = triggered.any(axis=0)
+        signals = [element_signals[first[i]] if any_triggered[i] else None for i in range(n)]
+        return signals, distances
+
+    def shutdown(self):
+        self.reader.shutdown(wait=False)
+        self.executor.shutdown(wait=False)
+
+
+def _price(value) -> float:
+    price = float(value)
+    if not math.isfinite(price):
+        raise ValueError(f"price {value!r} is not finite")
+    return price
+
+
+# Singleton instance
+market_scanner = MarketScanner()
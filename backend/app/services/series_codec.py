@@ -0,0 +1,118 @@
+import zlib
+import msgpack
+import numpy as np
+from typing import Any, Dict, List, Optional
+from services.columnar import TIME_COLUMNS, records_to_columns
+
+SERIES_FORMAT_VERSION = 1
+
+# Column encodings inside a blob
+KIND_ARRAY = "array"      # raw little-endian values
+KIND_DELTA = "delta"      # int64 epoch ms, first value then successive differences
+KIND_DICT = "dict"        # small set of strings: categories plus integer codes
+KIND_LIST = "list"        # anything else, as a msgpack list
+
+
+def encode_series(records: List[Dict]) -> bytes:
+    """
+    Pack a list of row dicts (trades, equity points) into a compressed blob
+
+    Rows are turned into typed columns. Timestamps are stored as delta-encoded
+    epoch milliseconds and repeated strings as dictionary codes, then the whole
+    container is zlib-compressed. Numeric values round-trip exactly.
+    """
+    columns = records_to_columns(records)
+    encoded = {}
+    for name, values in columns.items():
+        if name in TIME_COLUMNS and isinstance(values, np.ndarray) and values.dtype.kind == "i":
+            deltas = np.diff(values, prepend=np.int64(0)).astype("<i8")
+            encoded[name] = {"kind": KIND_DELTA, "data": deltas.tobytes()}
+        elif isinstance(values, np.ndarray):
+            encoded[name] = {"kind": KIND_ARRAY, "dtype": values.dtype.str, "data": values.tobytes()}
+        elif all(isinstance(v, str) for v in values):
+            categories, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+            code_dtype = "<u1" if len(categories) <= 0xFF else "<u2" if len(categories) <= 0xFFFF else "<u4"
+            encoded[name] = {
+                "kind": KIND_DICT,
+                "categories": categories.tolist(),
+                "dtype": code_dtype,
+                "data": codes.astype(code_dtype).tobytes()
+            }
+        else:
+            encoded[name] = {"kind": KIND_LIST, "data": values}
+
+    container = {
+        "v": SERIES_FORMAT_VERSION,
+        "length": len(records),
+        "order": list(encoded),
+        "columns": encoded
+    }
+    return zlib.compress(msgpack.packb(container, use_bin_type=True), 6)
+
+
+class SeriesBlob:
+    """
+    A stored series, decoded on first access
+
+    Columns come back as NumPy arrays (timestamps as int64 epoch ms) or lists.
+    Rows are only rebuilt for the slice a caller asks for.
+    """
+
+    def __init__(self, blob: bytes):
+        self.blob = blob
+        self._columns: Optional[Dict[str, Any]] = None
+        self._order: List[str] = []
+        self._length = 0
+
+    def __len__(self):
+        self._decode()
+        return self._length
+
+    def columns(self, offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Typed columns for rows [offset, offset + limit)"""
+        self._decode()
+        stop = None if limit is None else offset + limit
+        return {name: self._columns[name][offset:stop] for name in self._order}
+
+    def records(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """Row dicts for rows [offset, offset + limit), timestamps as ISO strings"""
+        columns = self.columns(offset, limit)
+        values = []
+        for name in self._order:
+            column = columns[name]
+            if name in TIME_COLUMNS and isinstance(column, np.ndarray):
+                column = _iso_times(column)
+            elif isinstance(column, np.ndarray):
+                column = column.tolist()
+            values.append(column)
+        return [dict(zip(self._order, row)) for row in zip(*values)]
+
+    def _decode(self):
+        if self._columns is not None:
+            return
+        container = msgpack.unpackb(zlib.decompress(self.blob), raw=False)
+        if container["v"] != SERIES_FORMAT_VERSION:
+            raise ValueError(f"Unsupported series format version {container['v']}")
+
+        columns = {}
+        for name, column in container["columns"].items():
+            kind = column["kind"]
+            if kind == KIND_DELTA:
+                columns[name] = np.cumsum(np.frombuffer(column["data"], dtype="<i8"))
+            elif kind == KIND_ARRAY:
+                columns[name] = np.frombuffer(column["data"], dtype=column["dtype"])
+            elif kind == KIND_DICT:
+                codes = np.frombuffer(column["data"], dtype=column["dtype"])
+                columns[name] = np.array(column["categories"], dtype=object)[codes].tolist()
+            else:
+                columns[name] = column["data"]
+
+        self._order = container["order"]
+        self._length = container["length"]
+        self._columns = columns
+
+
+def _iso_times(epoch_ms: np.ndarray) -> List[str]:
+    """Epoch milliseconds to ISO strings, dropping the fraction when it is always zero"""
+    unit = "s" if not np.any(epoch_ms % 1000) else "ms"
+    return np.datetime_as_string(epoch_ms.astype("datetime64[ms]"), unit=unit).tolist()
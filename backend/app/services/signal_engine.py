@@ -0,0 +1,248 @@
+import math
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+from database import SessionLocal, Strategy
+from services.bar_builder import bar_to_message
+
+_first = itemgetter(0)
+
+
+class LevelIndex:
+    """
+    Sorted price levels of many strategies on one symbol/timeframe
+
+    Horizontal lines are kept in one sorted list per action, zones in two
+    lists sorted by lower and by upper bound. A bar moving from prev_close to
+    close only touches levels inside that price range, so each query costs
+    O(log n + k) instead of a scan over every strategy.
+    """
+
+    def __init__(self):
+        self.buy_lines: List[Tuple] = []     # (price, strategy_id)
+        self.sell_lines: List[Tuple] = []    # (price, strategy_id)
+        self.zones_by_lower: List[Tuple] = []  # (lower, upper, strategy_id, signal)
+        self.zones_by_upper: List[Tuple] = []  # (upper, lower, strategy_id, signal)
+        self.entries: Dict[str, List[Tuple[List, Tuple]]] = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, strategy_id: str, visual_elements: List[Dict]):
+        """
+        Index a strategy's horizontal_line and zone elements
+
+        Elements are stored as free-form JSON, so malformed ones (missing or
+        non-numeric prices) are logged and skipped one at a time; the rest of
+        the strategy is still indexed and this never raises.
+        """
+        entries = []
+        for position, element in enumerate(visual_elements):
+            try:
+                entries.extend(self._element_entries(strategy_id, element))
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Strategy {strategy_id}: skipping visual element {position} ({e!r})")
+
+        for target, entry in entries:
+            insort(target, entry)
+        if entries:
+            self.entries[strategy_id] = entries
+
+    def _element_entries(self, strategy_id: str, element: Dict) -> List[Tuple[List, Tuple]]:
+        if element.get('type') == 'horizontal_line':
+            action = element.get('action')
+            target = self.buy_lines if action == 'buy_above' else self.sell_lines if action == 'sell_below' else None
+            if target is not None:
+                return [(target, (_price(element['price']), strategy_id))]
+
+        elif element.get('type') == 'zone':
+            action = element.get('action')
+            signal = 'buy' if action == 'buy_in_zone' else 'sell' if action == 'sell_in_zone' else None
+            if signal is not None:
+                lower, upper = _price(element['lower']), _price(element['upper'])
+                return [
+                    (self.zones_by_lower, (lower, upper, strategy_id, signal)),
+                    (self.zones_by_upper, (upper, lower, strategy_id, signal))
+                ]
+        return []
+
+    def remove(self, strategy_id: str):
+        """Drop every level belonging to a strategy"""
+        for target, entry in self.entries.pop(strategy_id, []):
+            i = bisect_left(target, entry)
+            if i < len(target) and target[i] == entry:
+                del target[i]
+
+    def crossed(self, prev_close: float, close: float) -> List[Dict]:
+        """Strategies whose lines were crossed or zones entered between two closes"""
+        hits = []
+        if close > prev_close:
+            # buy_above fires on an upward cross: prev_close <= price < close
+            lo = bisect_left(self.buy_lines, prev_close, key=_first)
+            hi = bisect_left(self.buy_lines, close, key=_first)
+            for price, strategy_id in self.buy_lines[lo:hi]:
+                hits.append({'strategy_id': strategy_id, 'signal': 'buy', 'trigger': 'horizontal_line', 'level': price})
+
+            # Zones entered from below: prev_close < lower <= close <= upper
+            lo = bisect_right(self.zones_by_lower, prev_close, key=_first)
+            hi = bisect_right(self.zones_by_lower, close, key=_first)
+            for lower, upper, strategy_id, signal in self.zones_by_lower[lo:hi]:
+                if upper >= close:
+                    hits.append({'strategy_id': strategy_id, 'signal': signal, 'trigger': 'zone', 'level': [lower, upper]})
+
+        elif close < prev_close:
+            # sell_below fires on a downward cross: close < price <= prev_close
+            lo = bisect_right(self.sell_lines, close, key=_first)
+            hi = bisect_right(self.sell_lines, prev_close, key=_first)
+            for price, strategy_id in self.sell_lines[lo:hi]:
+                hits.append({'strategy_id': strategy_id, 'signal': 'sell', 'trigger': 'horizontal_line', 'level': price})
+
+            # Zones entered from above: lower <= close <= upper < prev_close
+            lo = bisect_left(self.zones_by_upper, close, key=_first)
+            hi = bisect_left(self.zones_by_upper, prev_close, key=_first)
+            for upper, lower, strategy_id, signal in self.zones_by_upper[lo:hi]:
+                if lower <= close:
+                    hits.append({'strategy_id': strategy_id, 'signal': signal, 'trigger': 'zone', 'level': [lower, upper]})
+
+        return hits
+
+
+def _price(value) -> float:
+    price = float(value)
+    if not math.isfinite(price):
+        raise ValueError(f"price {value!r} is not finite")
+    return price
+
+
+class SignalEngine:
+    """
+    Evaluates every active strategy's price levels against live bars
+
+    Strategies are indexed per (symbol, timeframe). On each bar close only
+    the levels between the previous and current close are visited, and any
+    resulting signals are broadcast over /ws.
+    """
+
+    def __init__(self):
+        self.indexes: Dict[Tuple[str, str], LevelIndex] = {}
+        self.strategy_keys: Dict[str, Tuple[str, str]] = {}
+        self.last_close: Dict[Tuple[str, str], float] = {}
+        self.price_hub = None
+        self.manager = None
+
+    def start(self, price_hub, manager):
+        """Attach to the live bar stream and keep producers running for indexed symbols"""
+        self.price_hub = price_hub
+        self.manager = manager
+        price_hub.add_bar_listener(self.on_bar_closed)
+        for symbol, _ in self.strategy_keys.values():
+            price_hub.retain(symbol)
+
+    def stop(self):
+        if self.price_hub is not None:
+            self.price_hub.remove_bar_listener(self.on_bar_closed)
+        self.price_hub = None
+        self.manager = None
+
+    def load_active_strategies(self):
+        """Index every active strategy from the database (blocking)"""
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                Strategy.id, Strategy.symbol, Strategy.timeframe, Strategy.visual_elements
+            ).filter(Strategy.is_active == True).all()
+        finally:
+            db.close()
+
+        self.load([
+            {"id": str(r.id), "symbol": r.symbol, "timeframe": r.timeframe, "visual_elements": r.visual_elements}
+            for r in rows
+        ])
+
+    def load(self, strategies: List[Dict]):
+        """Index a batch of strategies (id, symbol, timeframe, visual_elements)"""
+        for strategy in strategies:
+            try:
+                self.upsert_strategy(
+                    strategy['id'],
+                    strategy['symbol'],
+                    strategy['timeframe'],
+                    strategy['visual_elements']
+                )
+            except Exception as e:
+                # One bad row must not stop the strategies after it
+                logger.error(f"Indexing strategy {strategy.get('id')} failed: {e}")
+        logger.info(f"Signal engine indexed {len(self.strategy_keys)} strategies")
+
+    def upsert_strategy(self, strategy_id: str, symbol: str, timeframe: str, visual_elements: Optional[List[Dict]]):
+        """Add or re-index a strategy"""
+        self.remove_strategy(strategy_id)
+        if not isinstance(visual_elements, list):
+            if visual_elements:
+                logger.warning(f"Strategy {strategy_id}: visual_elements is not a list, nothing indexed")
+            return
+
+        key = (symbol, str(timeframe).upper())
+        index = self.indexes.get(key)
+        if index is None:
+            index = self.indexes[key] = LevelIndex()
+        index.add(strategy_id, visual_elements)
+
+        if strategy_id not in index.entries:
+            # No live-evaluable levels
+            if not index:
+                del self.indexes[key]
+            return
+
+        self.strategy_keys[strategy_id] = key
+        if self.price_hub is not None:
+            self.price_hub.retain(symbol)
+
+    def remove_strategy(self, strategy_id: str):
+        """Stop evaluating a strategy"""
+        key = self.strategy_keys.pop(strategy_id, None)
+        if key is None:
+            return
+
+        index = self.indexes[key]
+        index.remove(strategy_id)
+        if not index:
+            del self.indexes[key]
+            self.last_close.pop(key, None)
+        if self.price_hub is not None:
+            self.price_hub.release(key[0])
+
+    def evaluate(self, symbol: str, timeframe: str, bar: Dict) -> List[Dict]:
+        """Find strategies triggered by a closed bar"""
+        key = (symbol, timeframe)
+        index = self.indexes.get(key)
+        close = bar['close']
+        prev_close = self.last_close.get(key, bar['open'])
+        self.last_close[key] = close
+        if index is None:
+            return []
+        return index.crossed(prev_close, close)
+
+    def on_bar_closed(self, symbol: str, timeframe: str, bar: Dict):
+        """Bar listener: emit signal messages for every hit"""
+        hits = self.evaluate(symbol, timeframe, bar)
+        if not hits or self.manager is None:
+            return
+
+        bar_time = bar_to_message(bar)['timestamp']
+        for hit in hits:
+            self.manager.enqueue_broadcast({
+                "type": "signal",
+                "data": {
+                    **hit,
+                    "symbol": symbol,
+                    "timeframe": timeframe,
+                    "price": bar['close'],
+                    "bar_time": bar_time
+                }
+            })
+
+
+# Singleton instance
+signal_engine = SignalEngine()
@@ -0,0 +1,108 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import select, update, func, case, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import Backtest, Strategy, StrategyStats
+
+
+class StrategyStatsService:
+    """
+    Keeps strategy_stats in step with the backtests table
+
+    Each saved backtest folds into its strategy's row with one upsert:
+    counts and sums are incremented, best/worst widened and the latest
+    result replaced if it is newer. The upsert reads the backtest row back
+    in SQL, so aggregates see exactly the rounded values that were stored.
+    It runs inside the caller's transaction and commits or rolls back
+    together with the backtest.
+    """
+
+    async def record_backtest(self, db: AsyncSession, backtest_id: uuid.UUID):
+        """Fold a flushed backtest into its strategy's aggregates (caller commits)"""
+        net_profit = Backtest.final_balance - Backtest.initial_balance
+        source = (
+            select(
+                Backtest.strategy_id,
+                Strategy.is_active,
+                literal(1),
+                func.coalesce(Backtest.total_trades, 0),
+                func.coalesce(Backtest.win_rate, 0),
+                func.coalesce(Backtest.profit_factor, 0),
+                func.coalesce(Backtest.max_drawdown, 0),
+                func.coalesce(Backtest.sharpe_ratio, 0),
+                func.coalesce(net_profit, 0),
+                Backtest.win_rate,
+                Backtest.profit_factor,
+                Backtest.sharpe_ratio,
+                net_profit,
+                net_profit,
+                Backtest.max_drawdown,
+                Backtest.id,
+                Backtest.created_at,
+                Backtest.win_rate,
+                Backtest.profit_factor,
+                Backtest.max_drawdown,
+                net_profit,
+                literal(datetime.utcnow())
+            )
+            .join(Strategy, Strategy.id == Backtest.strategy_id)
+            .where(Backtest.id == backtest_id)
+        )
+        stmt = insert(StrategyStats).from_select(
+            [
+                "strategy_id", "is_active", "backtest_count", "total_trades",
+                "sum_win_rate", "sum_profit_factor", "sum_max_drawdown", "sum_sharpe_ratio", "sum_net_profit",
+                "best_win_rate", "best_profit_factor", "best_sharpe_ratio", "best_net_profit",
+                "worst_net_profit", "worst_max_drawdown",
+                "latest_backtest_id", "latest_at", "latest_win_rate", "latest_profit_factor",
+                "latest_max_drawdown", "latest_net_profit", "updated_at"
+            ],
+            source
+        )
+
+        stats, new = StrategyStats.__table__.c, stmt.excluded
+        is_newer = func.coalesce(new.latest_at >= stats.latest_at, True)
+
+        def latest(column):
+            return case((is_newer, new[column.name]), else_=column)
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StrategyStats.strategy_id],
+            set_={
+                "backtest_count": stats.backtest_count + 1,
+                "total_trades": stats.total_trades + new.total_trades,
+                "sum_win_rate": stats.sum_win_rate + new.sum_win_rate,
+                "sum_profit_factor": stats.sum_profit_factor + new.sum_profit_factor,
+                "sum_max_drawdown": stats.sum_max_drawdown + new.sum_max_drawdown,
+                "sum_sharpe_ratio": stats.sum_sharpe_ratio + new.sum_sharpe_ratio,
+                "sum_net_profit": stats.sum_net_profit + new.sum_net_profit,
+                # GREATEST/LEAST skip NULLs, so a missing metric never wipes a known one
+                "best_win_rate": func.greatest(stats.best_win_rate, new.best_win_rate),
+                "best_profit_factor": func.greatest(stats.best_profit_factor, new.best_profit_factor),
+                "best_sharpe_ratio": func.greatest(stats.best_sharpe_ratio, new.best_sharpe_ratio),
+                "best_net_profit": func.greatest(stats.best_net_profit, new.best_net_profit),
+                "worst_net_profit": func.least(stats.worst_net_profit, new.worst_net_profit),
+                "worst_max_drawdown": func.greatest(stats.worst_max_drawdown, new.worst_max_drawdown),
+                "latest_backtest_id": latest(stats.latest_backtest_id),
+                "latest_at": latest(stats.latest_at),
+                "latest_win_rate": latest(stats.latest_win_rate),
+                "latest_profit_factor": latest(stats.latest_profit_factor),
+                "latest_max_drawdown": latest(stats.latest_max_drawdown),
+                "latest_net_profit": latest(stats.latest_net_profit),
+                "updated_at": new.updated_at
+            }
+        )
+        await db.execute(stmt)
+
+    async def set_active(self, db: AsyncSession, strategy_id: uuid.UUID, is_active: bool):
+        """Mirror a strategy's active flag so the leaderboard indexes can skip deleted ones"""
+        await db.execute(
+            update(StrategyStats)
+            .where(StrategyStats.strategy_id == strategy_id)
+            .values(is_active=is_active)
+        )
+
+
+# Singleton instance
+strategy_stats = StrategyStatsService()
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Type
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import AsyncSessionLocal, Strategy
+from services.mql5_generator import generate_many
+from services.mt5_service import TIMEFRAME_SECONDS
+from services.revision_store import revision_store
+from services.signal_engine import signal_engine
+
+# Fields written per strategy by the export, and read back by the import
+TRANSFER_FIELDS = (
+    "name", "description", "symbol", "timeframe", "version",
+    "visual_elements", "entry_rules", "exit_rules", "risk_management"
+)
+
+
+class StrategyTransfer:
+    """
+    Bulk strategy import and export as NDJSON, one strategy per line
+
+    Imports are read from the request stream and validated line by line.
+    Valid definitions are collected into batches of IMPORT_BATCH_SIZE. The
+    MQL5 code for a batch is generated on a process pool, split across the
+    workers, while the previous batch is being inserted. Each batch is
+    inserted with one multi-row statement and commits in its own
+    transaction together with the first revisions. A strategy is identified
+    by its name: a line whose name already exists, or appeared earlier in
+    the stream, is skipped, not overwritten.
+    """
+
+    def __init__(self, max_workers: int = settings.IMPORT_WORKERS, batch_size: int = settings.IMPORT_BATCH_SIZE):
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    async def import_stream(
+        self,
+        db: AsyncSession,
+        chunks: AsyncIterator[bytes],
+        schema: Type[BaseModel],
+        commit_message: str = "Imported"
+    ) -> Dict:
+        """
+        Import NDJSON strategy definitions from a byte stream
+
+        Returns:
+            Counts of imported, skipped (name already taken) and failed lines,
+            plus the first IMPORT_MAX_ERRORS line errors
+        """
+        result = {"imported": 0, "skipped": 0, "failed": 0, "errors": []}
+        batch: List[Tuple[int, Dict]] = []
+        pending: Optional[Tuple[List[Tuple[int, Dict]], asyncio.Future]] = None
+
+        async for line_no, line in _lines(chunks):
+            definition = self._validate(line, schema)
+            if isinstance(definition, str):
+                self._fail(result, line_no, definition)
+                continue
+            batch.append((line_no, definition))
+            if len(batch) >= self.batch_size:
+                # Generate this batch while the previous one is inserted
+                started = (batch, self._generate(batch))
+                if pending is not None:
+                    await self._insert(db, *pending, commit_message, result)
+                pending, batch = started, []
+
+        if batch:
+            started = (batch, self._generate(batch))
+            if pending is not None:
+                await self._insert(db, *pending, commit_message, result)
+            pending = started
+        if pending is not None:
+            await self._insert(db, *pending, commit_message, result)
+
+        logger.info(
+            f"Strategy import: {result['imported']} imported, "
+            f"{result['skipped']} skipped, {result['failed']} failed"
+        )
+        return result
+
+    async def export_stream(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Active strategies as NDJSON lines in the import format, read in id order"""
+        query = select(*(getattr(Strategy, field) for field in TRANSFER_FIELDS), Strategy.id).where(Strategy.is_active == True)
+        if symbol:
+            query = query.where(Strategy.symbol == symbol)
+        if timeframe:
+            query = query.where(Strategy.timeframe == timeframe.upper())
+
+        last_id = None
+        async with AsyncSessionLocal() as db:
+            while True:
+                page = query if last_id is None else query.where(Strategy.id > last_id)
+                rows = (await db.execute(page.order_by(Strategy.id).limit(self.batch_size))).all()
+                if not rows:
+                    return
+                yield "".join(
+                    json.dumps({field: getattr(row, field) for field in TRANSFER_FIELDS}, ensure_ascii=False) + "\n"
+                    for row in rows
+                ).encode()
+                last_id = rows[-1].id
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """The code generation pool, started on first use"""
+        if self.executor is None:
+            # Spawn rather than fork: the server process runs threads (MT5
+            # supervisor, executors) whose locks a forked child would inherit
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self.executor
+
+    def _validate(self, line: bytes, schema: Type[BaseModel]):
+        """Definition dict for a line, or an error message"""
+        try:
+            definition = schema.model_validate_json(line).dict()
+        except ValidationError as e:
+            return "; ".join(f"{'.'.join(map(str, err['loc'])) or 'line'}: {err['msg']}" for err in e.errors())
+        definition["timeframe"] = definition["timeframe"].upper()
+        if definition["timeframe"] not in TIMEFRAME_SECONDS:
+            return f"timeframe: invalid timeframe {definition['timeframe']}"
+        if not definition["name"].strip():
+            return "name: must not be empty"
+        if definition.get("version", 1) < 1:
+            return "version: must be at least 1"
+        return definition
+
+    def _generate(self, batch: List[Tuple[int, Dict]]) -> asyncio.Future:
+        """Start code generation for a batch, one chunk per worker"""
+        loop = asyncio.get_running_loop()
+        executor = self._pool()
+        definitions = [definition for _, definition in batch]
+        size = -(-len(definitions) // self.max_workers)
+        return asyncio.gather(*[
+            loop.run_in_executor(executor, generate_many, definitions[i:i + size])
+            for i in range(0, len(definitions), size)
+        ])
+
+    async def _insert(
+        self,
+        db: AsyncSession,
+        batch: List[Tuple[int, Dict]],
+        generated: asyncio.Future,
+        commit_message: str,
+        result: Dict
+    ):
+        codes = [item for chunk in await generated for item in chunk]
+
+        # Names are identities: skip names already taken, including by
+        # deleted strategies (unique_strategy_name covers those too)
+        names = {definition["name"] for _, definition in batch}
+        taken = set((await db.scalars(select(Strategy.name).where(Strategy.name.in_(names)))).all())
+
+        now = datetime.utcnow()
+        rows, line_numbers = [], {}
+        for (line_no, definition), (code, error) in zip(batch, codes):
+            if error is not None:
+                self._fail(result, line_no, f"Code generation failed: {error}")
+                continue
+            if definition["name"] in taken:
+                result["skipped"] += 1
+                self._report(result, line_no, f"A strategy named {definition['name']} already exists")
+                continue
+            taken.add(definition["name"])
+            row = {
+                **definition,
+                "id": uuid.uuid4(),
+                "version": definition.get("version", 1),
+                "mql5_code": code,
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now
+            }
+            rows.append(row)
+            line_numbers[row["id"]] = line_no
+        if not rows:
+            await db.rollback()
+            return
+
+        # A concurrent save may still take a name/version first; that row is skipped
+        inserted_ids = set((await db.scalars(
+            insert(Strategy.__table__).on_conflict_do_nothing().returning(Strategy.id), rows
+        )).all())
+        inserted = [row for row in rows if row["id"] in inserted_ids]
+        await revision_store.record_many(db, inserted, commit_message)
+        await db.commit()
+
+        for row in inserted:
+            signal_engine.upsert_strategy(str(row["id"]), row["symbol"], row["timeframe"], row["visual_elements"])
+
+        result["imported"] += len(inserted)
+        for row in rows:
+            if row["id"] not in inserted_ids:
+                result["skipped"] += 1
+                self._report(result, line_numbers[row["id"]], f"A strategy named {row['name']} already exists")
+
+    def _fail(self, result: Dict, line_no: int, message: str):
+        result["failed"] += 1
+        self._report(result, line_no, message)
+
+    def _report(self, result: Dict, line_no: int, message: str):
+        if len(result["errors"]) < settings.IMPORT_MAX_ERRORS:
+            result["errors"].append({"line": line_no, "error": message})
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Non-empty lines of a byte stream with their 1-based line numbers"""
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, line
+    if buffer.strip():
+        yield line_no + 1, buffer
+
+
+# Singleton instance
+strategy_transfer = StrategyTransfer()
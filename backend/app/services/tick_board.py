@@ -0,0 +1,308 @@
+import asyncio
+import os
+import numpy as np
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from loguru import logger
+from config import settings
+
+BOARD_MAGIC = 0x4D514C35  # "MQL5"
+BOARD_VERSION = 2
+
+HEADER_DTYPE = np.dtype([
+    ('magic', '<u4'),
+    ('version', '<u4'),
+    ('capacity', '<u4'),
+    ('max_symbols', '<u4'),
+    ('write_seq', '<u8')
+])
+
+# One tick record; seq is zeroed first and written last, so readers that see the
+# same seq before and after copying a record know it was not torn
+TICK_DTYPE = np.dtype([
+    ('seq', '<u8'),
+    ('symbol_id', '<u4'),
+    ('digits', '<u4'),
+    ('time_msc', '<i8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('last', '<f8'),
+    ('volume', '<u8')
+])
+
+NAME_DTYPE = np.dtype('S32')  # encoded symbol names longer than this are rejected
+HEADER_SIZE = 64
+
+
+def _layout(capacity: int, max_symbols: int) -> Tuple[int, int, int, int]:
+    """Byte offsets of the symbol names, latest ticks and ring, plus the total size"""
+    names_at = HEADER_SIZE
+    latest_at = names_at + max_symbols * NAME_DTYPE.itemsize
+    ring_at = latest_at + max_symbols * TICK_DTYPE.itemsize
+    total = ring_at + capacity * TICK_DTYPE.itemsize
+    return names_at, latest_at, ring_at, total
+
+
+class TickBoard:
+    """
+    Shared-memory board of live ticks written by one MT5 reader process
+
+    Layout: a header with the global write sequence, a symbol name table, the
+    latest tick per symbol, and a ring buffer of every published tick. There is
+    exactly one writer; any number of worker processes read without locks,
+    validating each slot's sequence number to detect records that were
+    overwritten while being read.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+
+        self.header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=shm.buf, offset=0)
+        if self.header['magic'][0] != BOARD_MAGIC or self.header['version'][0] != BOARD_VERSION:
+            raise ValueError(f"Shared memory '{shm.name}' is not a tick board")
+
+        self.capacity = int(self.header['capacity'][0])
+        self.max_symbols = int(self.header['max_symbols'][0])
+        names_at, latest_at, ring_at, _ = _layout(self.capacity, self.max_symbols)
+        self.names = np.ndarray((self.max_symbols,), dtype=NAME_DTYPE, buffer=shm.buf, offset=names_at)
+        self.latest = np.ndarray((self.max_symbols,), dtype=TICK_DTYPE, buffer=shm.buf, offset=latest_at)
+        self.ring = np.ndarray((self.capacity,), dtype=TICK_DTYPE, buffer=shm.buf, offset=ring_at)
+
+        self.symbol_ids: Dict[str, int] = {}
+        self.symbol_names: List[str] = []
+        self._load_names()
+
+    @classmethod
+    def create(cls, name: str, capacity: int, max_symbols: int) -> "TickBoard":
+        """Create the board (reader process only)"""
+        size = _layout(capacity, max_symbols)[3]
+        try:
+            # Drop a segment left behind by a previous run
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        shm.buf[:size] = bytes(size)
+        header = np.ndarray((1,), dtype=HEADER_DTYPE, buffer=shm.buf, offset=0)
+        header['capacity'] = capacity
+        header['max_symbols'] = max_symbols
+        header['version'] = BOARD_VERSION
+        header['magic'] = BOARD_MAGIC
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "TickBoard":
+        """Attach to an existing board (web workers)"""
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            # Attaching registers the segment with this process's resource
+            # tracker, which would unlink it on exit; only the owner may do that
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    @property
+    def write_seq(self) -> int:
+        return int(self.header['write_seq'][0])
+
+    def close(self):
+        del self.header, self.names, self.latest, self.ring
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    # ---------- writer ----------
+
+    def publish(self, symbol: str, price: Dict, digits: int):
+        """Append a tick to the ring and update the symbol's latest tick"""
+        sid = self.symbol_ids.get(symbol)
+        if sid is None:
+            sid = self._register(symbol)
+
+        seq = self.write_seq + 1
+        record = (0, sid, digits, price['time_msc'], price['bid'], price['ask'], price['last'], price['volume'])
+
+        for target in (self.ring[seq % self.capacity:seq % self.capacity + 1], self.latest[sid:sid + 1]):
+            target['seq'] = 0
+            target[0] = record
+            target['seq'] = seq
+
+        self.header['write_seq'] = seq
+
+    def _register(self, symbol: str) -> int:
+        encoded = symbol.encode()
+        if len(encoded) > NAME_DTYPE.itemsize:
+            # numpy would silently truncate it, and the name would never match
+            raise ValueError(f"Symbol name {symbol!r} is longer than {NAME_DTYPE.itemsize} bytes")
+        sid = len(self.symbol_names)
+        if sid >= self.max_symbols:
+            raise ValueError("Tick board symbol table is full")
+        self.names[sid] = encoded
+        self.symbol_ids[symbol] = sid
+        self.symbol_names.append(symbol)
+        return sid
+
+    # ---------- readers ----------
+
+    def read_since(self, cursor: int) -> Tuple[int, np.ndarray]:
+        """
+        Copy every record published after cursor
+
+        Returns:
+            (new cursor, records). If the reader fell more than a full ring
+            behind, the oldest records are skipped.
+        """
+        head = self.write_seq
+        if head <= cursor:
+            return cursor, self.ring[:0].copy()
+
+        start = max(cursor + 1, head - self.capacity + 1)
+        seqs = np.arange(start, head + 1, dtype=np.uint64)
+        slots = (seqs % self.capacity).astype(np.int64)
+        records = self.ring[slots].copy()
+
+        # The writer zeroes a slot's seq before rewriting it, so a slot whose
+        # seq still matches after the copy was not touched while we read it
+        valid = (records['seq'] == seqs) & (self.ring['seq'][slots] == seqs)
+        return head, records[valid]
+
+    def latest_tick(self, symbol: str) -> Optional[Dict]:
+        """Latest tick for a symbol, if it has ever been published"""
+        sid = self.symbol_ids.get(symbol)
+        if sid is None:
+            self._load_names()
+            sid = self.symbol_ids.get(symbol)
+            if sid is None:
+                return None
+        for _ in range(3):
+            record = self.latest[sid].copy()
+            if not record['seq']:
+                return None
+            if self.latest['seq'][sid] == record['seq']:
+                return self.to_price(record)
+        return None
+
+    def symbol_name(self, sid: int) -> str:
+        if sid >= len(self.symbol_names):
+            self._load_names()
+        return self.symbol_names[sid]
+
+    def to_price(self, record) -> Dict:
+        """Convert a record to the dict shape of MT5Service.get_current_price"""
+        time_msc = int(record['time_msc'])
+        return {
+            "symbol": self.symbol_name(int(record['symbol_id'])),
+            "bid": float(record['bid']),
+            "ask": float(record['ask']),
+            "last": float(record['last']),
+            "volume": int(record['volume']),
+            "time": datetime.fromtimestamp(time_msc // 1000).isoformat(),
+            "time_msc": time_msc,
+            "digits": int(record['digits'])
+        }
+
+    def _load_names(self):
+        names = []
+        for raw in self.names:
+            if not raw:
+                break
+            names.append(raw.decode())
+        self.symbol_names = names
+        self.symbol_ids = {name: i for i, name in enumerate(names)}
+
+
+class TickBoardClient:
+    """
+    A web worker's view of the tick board
+
+    Keeps a control connection to the reader process for subscriptions and
+    change notifications; tick data itself is read from shared memory. Each
+    notification carries the new write sequence, and the client hands every
+    record since its cursor to on_tick for the symbols it subscribed to.
+    """
+
+    def __init__(self, on_tick: Callable[[str, Dict], None]):
+        self.on_tick = on_tick
+        self.board: Optional[TickBoard] = None
+        self.cursor = 0
+        self.symbols: Set[str] = set()
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        if self.board is not None:
+            self.board.close()
+            self.board = None
+
+    def subscribe(self, symbol: str):
+        if symbol in self.symbols:
+            return
+        self.symbols.add(symbol)
+        self._send(f"SUB {symbol}")
+        # Seed with the last published tick so subscribers do not wait for the next one
+        if self.board is not None:
+            price = self.board.latest_tick(symbol)
+            if price is not None:
+                self.on_tick(symbol, price)
+
+    def unsubscribe(self, symbol: str):
+        if symbol in self.symbols:
+            self.symbols.discard(symbol)
+            self._send(f"UNSUB {symbol}")
+
+    def _send(self, line: str):
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.write(f"{line}\n".encode())
+
+    async def _run(self):
+        """Connect to the reader process and follow its notifications, reconnecting on loss"""
+        while True:
+            try:
+                if self.board is None:
+                    self.board = TickBoard.attach(settings.TICK_BOARD_NAME)
+                    self.cursor = self.board.write_seq
+
+                reader, self.writer = await asyncio.open_connection(settings.TICK_BOARD_HOST, settings.TICK_BOARD_PORT)
+                logger.info("Connected to tick board")
+                for symbol in self.symbols:
+                    self._send(f"SUB {symbol}")
+
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        raise ConnectionError("tick board closed the connection")
+                    self._drain()
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Tick board unavailable: {e}")
+                if self.board is not None:
+                    # The reader process may have restarted with a fresh segment
+                    self.board.close()
+                    self.board = None
+            finally:
+                if self.writer is not None:
+                    self.writer.close()
+                    self.writer = None
+
+            await asyncio.sleep(1)
+
+    def _drain(self):
+        """Dispatch every record published since the last notification"""
+        self.cursor, records = self.board.read_since(self.cursor)
+        for record in records:
+            symbol = self.board.symbol_name(int(record['symbol_id']))
+            if symbol in self.symbols:
+                self.on_tick(symbol, self.board.to_price(record))
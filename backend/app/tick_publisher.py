@@ -0,0 +1,140 @@
+"""
+Single MT5 reader process for multi-worker deployments
+
+Reads ticks for every symbol any web worker subscribed to and publishes them
+into the shared-memory tick board. Workers connect to the control port to
+subscribe and to be notified when new ticks are on the board.
+
+Run alongside uvicorn with TICK_BOARD_ENABLED=true:
+    python tick_publisher.py
+"""
+import asyncio
+import sys
+from typing import Dict, Set
+from loguru import logger
+
+from config import settings
+from services.mt5_service import mt5_service
+from services.tick_board import TickBoard
+
+logger.remove()
+logger.add(
+    sys.stderr,
+    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
+    level="INFO"
+)
+
+# Unsent notification bytes after which a slow worker is skipped
+NOTIFY_BUFFER_LIMIT = 4096
+
+class TickPublisher:
+    def __init__(self, board: TickBoard):
+        self.board = board
+        self.clients: Dict[asyncio.StreamWriter, Set[str]] = {}
+        self.last_tick: Dict[str, int] = {}
+        self.digits: Dict[str, int] = {}
+        self.rejected: Set[str] = set()  # symbols the board cannot hold
+
+    @property
+    def symbols(self) -> Set[str]:
+        """Union of every worker's subscriptions"""
+        return set().union(*self.clients.values()) if self.clients else set()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Control connection from one web worker"""
+        self.clients[writer] = set()
+        logger.info(f"Worker connected. Total: {len(self.clients)}")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command, _, symbol = line.decode().strip().partition(" ")
+                if command == "SUB" and symbol:
+                    self.clients[writer].add(symbol)
+                elif command == "UNSUB":
+                    self.clients[writer].discard(symbol)
+        except Exception as e:
+            logger.warning(f"Worker connection error: {e}")
+        finally:
+            self.clients.pop(writer, None)
+            writer.close()
+            logger.info(f"Worker disconnected. Total: {len(self.clients)}")
+
+    def poll(self, symbols: Set[str]) -> int:
+        """Read each symbol's tick once and publish the ones that changed (blocking)"""
+        published = 0
+        for symbol in symbols:
+            if symbol in self.rejected:
+                continue
+            if symbol not in self.digits:
+                info = mt5_service.get_symbol_info(symbol)
+                if info is None:
+                    continue
+                self.digits[symbol] = info['digits']
+
+            price = mt5_service.get_current_price(symbol)
+            if price is None or price['time_msc'] == self.last_tick.get(symbol):
+                continue
+            self.last_tick[symbol] = price['time_msc']
+            try:
+                self.board.publish(symbol, price, self.digits[symbol])
+            except ValueError as e:
+                logger.error(f"Not publishing {symbol}: {e}")
+                self.rejected.add(symbol)
+                continue
+            published += 1
+        return published
+
+    def notify(self):
+        """Tell every worker the board advanced"""
+        message = f"{self.board.write_seq}\n".encode()
+        for writer in list(self.clients):
+            if writer.is_closing():
+                continue
+            # A worker that has not read its earlier notifications gets none
+            # until it catches up; each one tells it to read everything since
+            # its cursor, so the ones dropped in between carry nothing extra
+            if writer.transport.get_write_buffer_size() > NOTIFY_BUFFER_LIMIT:
+                continue
+            writer.write(message)
+
+    async def run(self):
+        server = await asyncio.start_server(self.handle_client, settings.TICK_BOARD_HOST, settings.TICK_BOARD_PORT)
+        logger.info(f"Tick board '{settings.TICK_BOARD_NAME}' serving on {settings.TICK_BOARD_HOST}:{settings.TICK_BOARD_PORT}")
+
+        async with server:
+            while True:
+                symbols = self.symbols
+                if symbols:
+                    try:
+                        if await asyncio.to_thread(self.poll, symbols):
+                            self.notify()
+                    except Exception as e:
+                        logger.error(f"Tick publish error: {e}")
+                await asyncio.sleep(settings.PRICE_POLL_INTERVAL)
+
+
+def main():
+    board = TickBoard.create(
+        settings.TICK_BOARD_NAME,
+        settings.TICK_BOARD_CAPACITY,
+        settings.TICK_BOARD_MAX_SYMBOLS
+    )
+
+    if not mt5_service.connect():
+        logger.warning("MT5 connection failed - retrying in background")
+    mt5_service.start_supervisor()
+
+    try:
+        asyncio.run(TickPublisher(board).run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mt5_service.stop_supervisor()
+        mt5_service.disconnect()
+        board.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+-- Compressed columnar storage for backtest trades and equity curves
+-- New backtests write trades_blob/equity_blob (see services/series_codec.py)
+-- and leave the JSONB columns empty; rows written before this migration keep
+-- their JSONB arrays and are still served from them.
+
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS trades_blob BYTEA;
+ALTER TABLE backtests ADD COLUMN IF NOT EXISTS equity_blob BYTEA;
+
+-- Blobs are compressed already; keep TOAST from trying again
+ALTER TABLE backtests ALTER COLUMN trades_blob SET STORAGE EXTERNAL;
+ALTER TABLE backtests ALTER COLUMN equity_blob SET STORAGE EXTERNAL;
@@ -0,0 +1,11 @@
+-- Indexes behind keyset pagination and filtered listing
+-- (GET /api/strategies and GET /api/strategies/{id}/backtests).
+-- Each list is ordered newest first by (timestamp, id) and continues from an
+-- X-Next-Cursor value, so every page is an index range scan.
+
+DROP INDEX IF EXISTS idx_strategy_backtests;
+CREATE INDEX IF NOT EXISTS idx_strategies_updated ON strategies(updated_at DESC, id DESC) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_strategies_symbol_timeframe ON strategies(symbol, timeframe, updated_at DESC, id DESC) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_strategy_backtests ON backtests(strategy_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_backtests_win_rate ON backtests(strategy_id, win_rate);
+CREATE INDEX IF NOT EXISTS idx_backtests_profit_factor ON backtests(strategy_id, profit_factor);
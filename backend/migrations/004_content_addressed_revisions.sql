@@ -0,0 +1,23 @@
+-- Content-addressed strategy revision history
+-- Snapshots and generated code live in content_blobs keyed by the sha256 of
+-- their text (see services/revision_store.py), either whole or as a line
+-- delta against the previous version's blob. Revisions only hold the hashes.
+
+CREATE TABLE IF NOT EXISTS content_blobs (
+    hash VARCHAR(64) PRIMARY KEY,
+    kind VARCHAR(10) NOT NULL,
+    base_hash VARCHAR(64) REFERENCES content_blobs(hash),
+    depth INTEGER NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL,
+    data BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Blobs are compressed already; keep TOAST from trying again
+ALTER TABLE content_blobs ALTER COLUMN data SET STORAGE EXTERNAL;
+
+ALTER TABLE strategy_revisions ADD COLUMN IF NOT EXISTS snapshot_hash VARCHAR(64) REFERENCES content_blobs(hash);
+ALTER TABLE strategy_revisions ADD COLUMN IF NOT EXISTS code_hash VARCHAR(64) REFERENCES content_blobs(hash);
+
+-- Inline copies are no longer written
+ALTER TABLE strategy_revisions ALTER COLUMN snapshot DROP NOT NULL;
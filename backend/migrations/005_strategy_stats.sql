@@ -0,0 +1,109 @@
+-- Incrementally maintained per-strategy backtest aggregates
+-- strategy_stats is upserted in the same transaction as every saved backtest
+-- (services/strategy_stats.py); the leaderboard (GET /api/leaderboard) and
+-- the strategy_performance view read from it instead of scanning backtests.
+
+CREATE TABLE IF NOT EXISTS strategy_stats (
+    strategy_id UUID PRIMARY KEY REFERENCES strategies(id) ON DELETE CASCADE,
+    is_active BOOLEAN NOT NULL DEFAULT true,
+    
+    -- Counts and sums
+    backtest_count INTEGER NOT NULL DEFAULT 0,
+    total_trades BIGINT NOT NULL DEFAULT 0,
+    sum_win_rate DECIMAL NOT NULL DEFAULT 0,
+    sum_profit_factor DECIMAL NOT NULL DEFAULT 0,
+    sum_max_drawdown DECIMAL NOT NULL DEFAULT 0,
+    sum_sharpe_ratio DECIMAL NOT NULL DEFAULT 0,
+    sum_net_profit DECIMAL NOT NULL DEFAULT 0,
+    
+    -- Averages
+    avg_win_rate DECIMAL(10, 4) GENERATED ALWAYS AS (ROUND(sum_win_rate / NULLIF(backtest_count, 0), 4)) STORED,
+    avg_profit_factor DECIMAL(10, 4) GENERATED ALWAYS AS (ROUND(sum_profit_factor / NULLIF(backtest_count, 0), 4)) STORED,
+    avg_max_drawdown DECIMAL(10, 4) GENERATED ALWAYS AS (ROUND(sum_max_drawdown / NULLIF(backtest_count, 0), 4)) STORED,
+    avg_sharpe_ratio DECIMAL(10, 4) GENERATED ALWAYS AS (ROUND(sum_sharpe_ratio / NULLIF(backtest_count, 0), 4)) STORED,
+    
+    -- Best and worst
+    best_win_rate DECIMAL(5, 2),
+    best_profit_factor DECIMAL(10, 2),
+    best_sharpe_ratio DECIMAL(10, 4),
+    best_net_profit DECIMAL(15, 2),
+    worst_net_profit DECIMAL(15, 2),
+    worst_max_drawdown DECIMAL(10, 2),
+    
+    -- Most recent backtest
+    latest_backtest_id UUID,
+    latest_at TIMESTAMP,
+    latest_win_rate DECIMAL(5, 2),
+    latest_profit_factor DECIMAL(10, 2),
+    latest_max_drawdown DECIMAL(10, 2),
+    latest_net_profit DECIMAL(15, 2),
+    
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Leaderboard orderings
+CREATE INDEX IF NOT EXISTS idx_stats_avg_profit_factor ON strategy_stats(avg_profit_factor DESC NULLS LAST, strategy_id) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_stats_avg_win_rate ON strategy_stats(avg_win_rate DESC NULLS LAST, strategy_id) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_stats_avg_sharpe_ratio ON strategy_stats(avg_sharpe_ratio DESC NULLS LAST, strategy_id) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_stats_avg_max_drawdown ON strategy_stats(avg_max_drawdown ASC NULLS LAST, strategy_id) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_stats_best_net_profit ON strategy_stats(best_net_profit DESC NULLS LAST, strategy_id) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_stats_latest_profit_factor ON strategy_stats(latest_profit_factor DESC NULLS LAST, strategy_id) WHERE is_active;
+
+-- Backfill from existing backtests
+INSERT INTO strategy_stats (
+    strategy_id, is_active, backtest_count, total_trades,
+    sum_win_rate, sum_profit_factor, sum_max_drawdown, sum_sharpe_ratio, sum_net_profit,
+    best_win_rate, best_profit_factor, best_sharpe_ratio, best_net_profit,
+    worst_net_profit, worst_max_drawdown,
+    latest_backtest_id, latest_at, latest_win_rate, latest_profit_factor,
+    latest_max_drawdown, latest_net_profit
+)
+SELECT
+    agg.strategy_id, s.is_active, agg.backtest_count, agg.total_trades,
+    agg.sum_win_rate, agg.sum_profit_factor, agg.sum_max_drawdown, agg.sum_sharpe_ratio, agg.sum_net_profit,
+    agg.best_win_rate, agg.best_profit_factor, agg.best_sharpe_ratio, agg.best_net_profit,
+    agg.worst_net_profit, agg.worst_max_drawdown,
+    latest.id, latest.created_at, latest.win_rate, latest.profit_factor,
+    latest.max_drawdown, latest.final_balance - latest.initial_balance
+FROM (
+    SELECT
+        strategy_id,
+        COUNT(*) AS backtest_count,
+        COALESCE(SUM(total_trades), 0) AS total_trades,
+        COALESCE(SUM(win_rate), 0) AS sum_win_rate,
+        COALESCE(SUM(profit_factor), 0) AS sum_profit_factor,
+        COALESCE(SUM(max_drawdown), 0) AS sum_max_drawdown,
+        COALESCE(SUM(sharpe_ratio), 0) AS sum_sharpe_ratio,
+        COALESCE(SUM(final_balance - initial_balance), 0) AS sum_net_profit,
+        MAX(win_rate) AS best_win_rate,
+        MAX(profit_factor) AS best_profit_factor,
+        MAX(sharpe_ratio) AS best_sharpe_ratio,
+        MAX(final_balance - initial_balance) AS best_net_profit,
+        MIN(final_balance - initial_balance) AS worst_net_profit,
+        MAX(max_drawdown) AS worst_max_drawdown
+    FROM backtests
+    GROUP BY strategy_id
+) agg
+JOIN strategies s ON s.id = agg.strategy_id
+JOIN LATERAL (
+    SELECT * FROM backtests b
+    WHERE b.strategy_id = agg.strategy_id
+    ORDER BY b.created_at DESC, b.id DESC
+    LIMIT 1
+) latest ON true
+ON CONFLICT (strategy_id) DO NOTHING;
+
+-- Same columns as before, now a primary-key join instead of an aggregate
+DROP VIEW IF EXISTS strategy_performance;
+CREATE VIEW strategy_performance AS
+SELECT 
+    s.id as strategy_id,
+    s.name,
+    s.version,
+    COALESCE(st.backtest_count, 0)::bigint as total_backtests,
+    st.avg_win_rate,
+    st.avg_profit_factor,
+    st.avg_max_drawdown
+FROM strategies s
+LEFT JOIN strategy_stats st ON s.id = st.strategy_id
+WHERE s.is_active = true;
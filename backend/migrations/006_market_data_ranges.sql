@@ -0,0 +1,14 @@
+-- Spans of market_data fetched in full from the terminal.
+-- The bar cache only serves a range from Postgres when these spans cover it
+-- end to end; bars that exist outside any span are not trusted as complete.
+
+CREATE TABLE IF NOT EXISTS market_data_ranges (
+    id BIGSERIAL PRIMARY KEY,
+    symbol VARCHAR(20) NOT NULL,
+    timeframe VARCHAR(10) NOT NULL,
+    start_time TIMESTAMP NOT NULL,
+    end_time TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_market_data_ranges_lookup ON market_data_ranges(symbol, timeframe, end_time);
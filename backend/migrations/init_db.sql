@@ -53,21 +53,78 @@ CREATE TABLE backtests (
     max_drawdown DECIMAL(10, 2),
     sharpe_ratio DECIMAL(10, 4),
     
-    -- Trade details stored as JSONB
+    -- Trade details: legacy JSONB arrays, superseded by the compressed columnar blobs
     trades JSONB NOT NULL DEFAULT '[]'::jsonb,
     equity_curve JSONB NOT NULL DEFAULT '[]'::jsonb,
+    trades_blob BYTEA,
+    equity_blob BYTEA,
     
     -- Execution info
     execution_time_ms INTEGER,
     status VARCHAR(20) DEFAULT 'pending',
     error_message TEXT,
     
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    
-    -- Indexing
-    INDEX idx_strategy_backtests (strategy_id, created_at DESC)
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Keyset pagination and filtered listing
+CREATE INDEX IF NOT EXISTS idx_strategies_updated ON strategies(updated_at DESC, id DESC) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_strategies_symbol_timeframe ON strategies(symbol, timeframe, updated_at DESC, id DESC) WHERE is_active;
+CREATE INDEX IF NOT EXISTS idx_strategy_backtests ON backtests(strategy_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_backtests_win_rate ON backtests(strategy_id, win_rate);
+CREATE INDEX IF NOT EXISTS idx_backtests_profit_factor ON backtests(strategy_id, profit_factor);
+
+-- Blobs are compressed already; keep TOAST from trying again
+ALTER TABLE backtests ALTER COLUMN trades_blob SET STORAGE EXTERNAL;
+ALTER TABLE backtests ALTER COLUMN equity_blob SET STORAGE EXTERNAL;
+
+-- Per-strategy backtest aggregates, upserted with every saved backtest
+CREATE TABLE strategy_stats (
+    strategy_id UUID PRIMARY KEY REFERENCES strategies(id) ON DELETE CASCADE,
+    is_active BOOLEAN NOT NULL DEFAULT true,
+    
+    -- Counts and sums
+    backtest_count INTEGER NOT NULL DEFAULT 0,
+    total_trades BIGINT NOT NULL DEFAULT 0,
+    sum_win_rate DECIMAL NOT NULL DEFAULT 0,
+    sum_profit_factor DECIMAL NOT NULL DEFAULT 0,
+    sum_max_drawdown DECIMAL NOT NULL DEFAULT 0,
+    sum_sharpe_ratio DECIMAL NOT NULL DEFAULT 0,
+    sum_net_profit DECIMAL NOT NULL DEFAULT 0,
+    
+    -- Averages
+    avg_win_rate DECIMAL(10, 4) GENERATED ALWAYS AS (ROUND(sum_win_rate / NULLIF(backtest_count, 0), 4)) STORED,
+    avg_profit_factor DECIMAL(10, 4) GENERATED ALWAYS AS (ROUND(sum_profit_factor / NULLIF(backtest_count, 0), 4)) STORED,
+    avg_max_drawdown DECIMAL(10, 4) GENERATED ALWAYS AS (ROUND(sum_max_drawdown / NULLIF(backtest_count, 0), 4)) STORED,
+    avg_sharpe_ratio DECIMAL(10, 4) GENERATED ALWAYS AS (ROUND(sum_sharpe_ratio / NULLIF(backtest_count, 0), 4)) STORED,
+    
+    -- Best and worst
+    best_win_rate DECIMAL(5, 2),
+    best_profit_factor DECIMAL(10, 2),
+    best_sharpe_ratio DECIMAL(10, 4),
+    best_net_profit DECIMAL(15, 2),
+    worst_net_profit DECIMAL(15, 2),
+    worst_max_drawdown DECIMAL(10, 2),
+    
+    -- Most recent backtest
+    latest_backtest_id UUID,
+    latest_at TIMESTAMP,
+    latest_win_rate DECIMAL(5, 2),
+    latest_profit_factor DECIMAL(10, 2),
+    latest_max_drawdown DECIMAL(10, 2),
+    latest_net_profit DECIMAL(15, 2),
+    
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Leaderboard orderings
+CREATE INDEX idx_stats_avg_profit_factor ON strategy_stats(avg_profit_factor DESC NULLS LAST, strategy_id) WHERE is_active;
+CREATE INDEX idx_stats_avg_win_rate ON strategy_stats(avg_win_rate DESC NULLS LAST, strategy_id) WHERE is_active;
+CREATE INDEX idx_stats_avg_sharpe_ratio ON strategy_stats(avg_sharpe_ratio DESC NULLS LAST, strategy_id) WHERE is_active;
+CREATE INDEX idx_stats_avg_max_drawdown ON strategy_stats(avg_max_drawdown ASC NULLS LAST, strategy_id) WHERE is_active;
+CREATE INDEX idx_stats_best_net_profit ON strategy_stats(best_net_profit DESC NULLS LAST, strategy_id) WHERE is_active;
+CREATE INDEX idx_stats_latest_profit_factor ON strategy_stats(latest_profit_factor DESC NULLS LAST, strategy_id) WHERE is_active;
+
 -- Market data cache: stores historical data for quick backtesting
 CREATE TABLE market_data (
     id BIGSERIAL PRIMARY KEY,
@@ -89,14 +146,43 @@ CREATE TABLE market_data (
 -- Index for fast time-series queries
 CREATE INDEX idx_market_data_lookup ON market_data(symbol, timeframe, timestamp DESC);
 
+-- Spans of market_data fetched in full from the terminal
+CREATE TABLE market_data_ranges (
+    id BIGSERIAL PRIMARY KEY,
+    symbol VARCHAR(20) NOT NULL,
+    timeframe VARCHAR(10) NOT NULL,
+    start_time TIMESTAMP NOT NULL,
+    end_time TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_market_data_ranges_lookup ON market_data_ranges(symbol, timeframe, end_time);
+
+-- Content-addressed blobs for revision snapshots and code
+CREATE TABLE content_blobs (
+    hash VARCHAR(64) PRIMARY KEY,  -- sha256 of the full text
+    kind VARCHAR(10) NOT NULL,  -- full | delta
+    base_hash VARCHAR(64) REFERENCES content_blobs(hash),
+    depth INTEGER NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL,
+    data BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE content_blobs ALTER COLUMN data SET STORAGE EXTERNAL;
+
 -- Strategy revisions: git-style version history
 CREATE TABLE strategy_revisions (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     strategy_id UUID NOT NULL REFERENCES strategies(id) ON DELETE CASCADE,
     version INTEGER NOT NULL,
     
-    -- Snapshot of strategy at this version
-    snapshot JSONB NOT NULL,
+    -- Snapshot of strategy at this version, by content hash
+    snapshot_hash VARCHAR(64) REFERENCES content_blobs(hash),
+    code_hash VARCHAR(64) REFERENCES content_blobs(hash),
+    
+    -- Legacy inline copies
+    snapshot JSONB,
     mql5_code TEXT,
     
     -- Commit-style metadata
@@ -141,14 +227,13 @@ SELECT
     s.id as strategy_id,
     s.name,
     s.version,
-    COUNT(b.id) as total_backtests,
-    AVG(b.win_rate) as avg_win_rate,
-    AVG(b.profit_factor) as avg_profit_factor,
-    AVG(b.max_drawdown) as avg_max_drawdown
+    COALESCE(st.backtest_count, 0)::bigint as total_backtests,
+    st.avg_win_rate,
+    st.avg_profit_factor,
+    st.avg_max_drawdown
 FROM strategies s
-LEFT JOIN backtests b ON s.id = b.strategy_id
-WHERE s.is_active = true
-GROUP BY s.id, s.name, s.version;
+LEFT JOIN strategy_stats st ON s.id = st.strategy_id
+WHERE s.is_active = true;
 
 -- Grant permissions (adjust as needed for your setup)
 -- GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO your_user;
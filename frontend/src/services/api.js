@@ -73,7 +73,8 @@ export const strategyService = {
 export const backtestService = {
   run: (backtestData) => api.post('/backtests', backtestData),
   
-  get: (backtestId) => api.get(`/backtests/${backtestId}`),
+  get: (backtestId, include = 'trades,equity') =>
+    api.get(`/backtests/${backtestId}`, { params: { include } }),
 };
 
 // Health Check
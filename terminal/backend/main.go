@@ -39,6 +39,7 @@ func main() {
 	http.HandleFunc("/ws", handleWebSocket)
 	http.HandleFunc("/health", handleHealth)
 	http.HandleFunc("/api/historical", handleHistoricalData)
+	http.HandleFunc("/ticks", handleTicks)
 
 	// Enable CORS
 	handler := enableCORS(http.DefaultServeMux)
@@ -109,6 +110,33 @@ func handleHistoricalData(w http.ResponseWriter, r *http.Request) {
 	json.NewEncoder(w).Encode(rates)
 }
 
+func handleTicks(w http.ResponseWriter, r *http.Request) {
+	if r.Method != http.MethodPost {
+		http.Error(w, "Method not allowed", http.StatusMethodNotAllowed)
+		return
+	}
+
+	// The MT5 bridge posts ticks in batches as a JSON array
+	var ticks []mt5.Tick
+	if err := json.NewDecoder(r.Body).Decode(&ticks); err != nil {
+		http.Error(w, "Invalid tick batch", http.StatusBadRequest)
+		return
+	}
+
+	for _, tick := range ticks {
+		hub.BroadcastMessage(ws.Message{
+			Type:   "tick",
+			Symbol: tick.Symbol,
+			Time:   tick.Time,
+			Price:  tick.Bid,
+			Close:  tick.Bid,
+			Volume: tick.Volume,
+		})
+	}
+
+	w.WriteHeader(http.StatusNoContent)
+}
+
 func simulateMarketData() {
 	ticker := time.NewTicker(1 * time.Second)
 	defer ticker.Stop()
@@ -36,6 +36,16 @@ type Rate struct {
 	Volume int64     `json:"tick_volume"`
 }
 
+// Tick as forwarded by the Python bridge in batches to /ticks
+type Tick struct {
+	Symbol string  `json:"symbol"`
+	Time   int64   `json:"time"` // milliseconds
+	Bid    float64 `json:"bid"`
+	Ask    float64 `json:"ask"`
+	Last   float64 `json:"last"`
+	Volume int64   `json:"volume"`
+}
+
 type AccountInfo struct {
 	Balance    float64 `json:"balance"`
 	Equity     float64 `json:"equity"`
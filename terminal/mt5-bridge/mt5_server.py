@@ -1,11 +1,18 @@
-import MetaTrader5 as mt5
-from flask import Flask, jsonify, request
+import MetaTrader5
+from flask import Flask, jsonify, request, g
 from flask_cors import CORS
-import pandas as pd
-from datetime import datetime, timedelta
+import numpy as np
+from datetime import datetime, timedelta, timezone
+import functools
+import math
+import os
+import sys
 import threading
 import time
 import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 app = Flask(__name__)
 CORS(app)
@@ -16,10 +23,150 @@ MT5_LOGIN = None  # Your MT5 account login
 MT5_PASSWORD = None  # Your MT5 password
 MT5_SERVER = None  # Your broker server
 
+# Tick forwarding to the Go backend
+TICK_BATCH_SIZE = 500  # ticks per POST
+TICK_FLUSH_INTERVAL = 0.05  # seconds a tick may wait for its batch to fill
+TICK_BUFFER_SIZE = 10000  # ticks buffered while the backend is slow; oldest dropped first
+TICK_POST_TIMEOUT = 2  # seconds
+
+# Tick capture polling: fast while ticks arrive, backing off when the market is quiet
+STREAM_MIN_INTERVAL = 0.01  # seconds
+STREAM_MAX_INTERVAL = 0.5  # seconds
+STREAM_MAX_TICKS = 10000  # ticks fetched per symbol per pass
+
+# /rates
+RATES_MAX_COUNT = 50000  # bars per request
+
+# Account/positions feed
+FEED_INTERVAL = 0.5  # seconds between snapshots
+FEED_HISTORY = 1000  # versions kept for /feed?since=N; older cursors get a full snapshot
+FEED_MAX_WAIT = 30  # seconds a /feed long-poll may wait
+FEED_RETRY_AFTER = 1  # seconds a long-poll turned away at the cap is told to wait before retrying
+
+# Production serving (python mt5_server.py --production, or BRIDGE_ENV=production)
+SERVER_THREADS = 16  # waitress worker threads; /feed long-polls hold one each
+FEED_RESERVED_THREADS = 4  # threads long-polls never take, so other requests are still served
+FEED_MAX_WAITERS = SERVER_THREADS - FEED_RESERVED_THREADS  # concurrent /feed long-polls
+SERVER_CONNECTION_LIMIT = 200
+METRICS_WINDOW = 1024  # latest samples kept per request route / terminal call
+
+# Terminal calls that only read state; identical concurrent ones share one call
+TERMINAL_READS = {
+    'version', 'terminal_info', 'account_info', 'positions_get', 'symbols_get',
+    'symbol_info', 'symbol_info_tick', 'copy_rates_from_pos', 'copy_rates_range',
+    'copy_ticks_from', 'copy_ticks_range',
+}
+
+class LatencyStats:
+    """Rolling latency percentiles per name"""
+    
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+        self.lock = threading.Lock()
+    
+    def record(self, name, seconds):
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self.counts[name] = self.counts.get(name, 0) + 1
+    
+    def summary(self):
+        with self.lock:
+            snapshot = {name: (self.counts[name], np.array(samples)) for name, samples in self.samples.items()}
+        
+        result = {}
+        for name, (count, samples) in snapshot.items():
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+            result[name] = {
+                'count': count,
+                'avg_ms': round(float(samples.mean()) * 1000, 3),
+                'p50_ms': round(float(p50), 3),
+                'p95_ms': round(float(p95), 3),
+                'p99_ms': round(float(p99), 3),
+                'max_ms': round(float(samples.max()) * 1000, 3),
+            }
+        return result
+
+class Terminal:
+    """
+    Serialized access to the MetaTrader5 API
+    
+    The MetaTrader5 module is process-global and not safe to call from many
+    threads at once, so every call is run on one owner thread. Concurrent
+    identical reads (same function and arguments) wait on the call already in
+    flight instead of queueing another one. Non-callable attributes such as
+    the TIMEFRAME_* constants pass straight through.
+    """
+    
+    def __init__(self, module, metrics):
+        self._module = module
+        self._metrics = metrics
+        self._owner = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mt5-owner', initializer=self._bind_owner)
+        self._inflight = {}
+        self._lock = threading.RLock()
+        self.shared_reads = 0
+    
+    def __getattr__(self, name):
+        attr = getattr(self._module, name)
+        if not callable(attr):
+            return attr
+        return functools.partial(self.call, name)
+    
+    @property
+    def queue_depth(self):
+        return self._executor._work_queue.qsize()
+    
+    def call(self, name, *args, **kwargs):
+        fn = getattr(self._module, name)
+        if threading.get_ident() == self._owner:
+            return fn(*args, **kwargs)
+        
+        if name not in TERMINAL_READS or kwargs:
+            return self._executor.submit(self._timed, name, fn, args, kwargs).result()
+        
+        key = (name, args)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._timed, name, fn, args, kwargs)
+                self._inflight[key] = future
+                future.add_done_callback(functools.partial(self._forget, key))
+            else:
+                self.shared_reads += 1
+        return future.result()
+    
+    def _bind_owner(self):
+        self._owner = threading.get_ident()
+    
+    def _timed(self, name, fn, args, kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._metrics.record(name, time.perf_counter() - started)
+    
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+request_metrics = LatencyStats()
+terminal_metrics = LatencyStats()
+mt5 = Terminal(MetaTrader5, terminal_metrics)
+
 class MT5Bridge:
     def __init__(self):
         self.connected = False
         self.streaming = False
+        self.stream_symbols = set()
+        self.stream_thread = None
+        self.stream_cursors = {}  # symbol -> (last time_msc, ticks seen at that time_msc)
+        self.stream_lock = threading.Lock()
         
     def connect(self, login=None, password=None, server=None):
         """Connect to MT5 terminal"""
@@ -64,8 +211,13 @@ class MT5Bridge:
             'point': symbol_info.point,
         }
     
-    def get_rates(self, symbol, timeframe, count=100):
-        """Get historical rates"""
+    def get_rates(self, symbol, timeframe, count=100, since=None):
+        """
+        Get historical rates
+        
+        With since (epoch seconds), only bars opened after it are returned,
+        plus the forming bar so pollers see its latest state.
+        """
         if not self.connected:
             return None
         
@@ -90,10 +242,22 @@ class MT5Bridge:
             print(f"Failed to get rates for {symbol}")
             return None
         
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
+        if since is not None and len(rates):
+            start = min(int(np.searchsorted(rates['time'], since, side='right')), len(rates) - 1)
+            rates = rates[start:]
         
-        return df.to_dict('records')
+        return self._rates_to_records(rates)
+    
+    def _rates_to_records(self, rates):
+        """Encode a structured rates array as JSON-ready dicts with RFC3339 times"""
+        times = np.datetime_as_string(rates['time'].astype('datetime64[s]'), unit='s')
+        names = rates.dtype.names
+        records = []
+        for time_str, row in zip(times, rates.tolist()):
+            record = dict(zip(names, row))
+            record['time'] = f"{time_str}Z"
+            records.append(record)
+        return records
     
     def get_account_info(self):
         """Get account information"""
@@ -134,25 +298,329 @@ class MT5Bridge:
             'tp': pos.tp,
         } for pos in positions]
     
-    def stream_ticks(self, symbol, callback):
-        """Stream real-time ticks"""
-        print(f"Starting tick stream for {symbol}")
+    def start_streaming(self, symbols, callback):
+        """Add symbols to the tick capture loop, starting it if needed"""
+        with self.stream_lock:
+            self.stream_symbols.update(symbols)
+            self.streaming = True
+            if self.stream_thread is None or not self.stream_thread.is_alive():
+                self.stream_thread = threading.Thread(target=self.stream_ticks, args=(callback,), daemon=True)
+                self.stream_thread.start()
+    
+    def stop_streaming(self, symbols=None):
+        """Remove symbols from the capture loop; stop it when none are left"""
+        with self.stream_lock:
+            if symbols is None:
+                self.stream_symbols.clear()
+            else:
+                self.stream_symbols.difference_update(symbols)
+            if not self.stream_symbols:
+                self.streaming = False
+    
+    def stream_ticks(self, callback):
+        """
+        Capture every tick of the streamed symbols in one loop
+        
+        Each pass fetches all ticks since the last one seen per symbol with
+        copy_ticks_from, so nothing between passes is missed. The poll interval
+        halves while ticks arrive and doubles while the market is quiet.
+        """
+        print("Starting tick capture")
+        interval = STREAM_MIN_INTERVAL
         
-        while self.streaming:
+        while True:
+            with self.stream_lock:
+                if not self.streaming:
+                    # Exit under the lock so start_streaming never sees a dying thread
+                    self.stream_thread = None
+                    self.stream_cursors.clear()
+                    break
+                symbols = list(self.stream_symbols)
+            for symbol in list(self.stream_cursors):
+                if symbol not in symbols:
+                    del self.stream_cursors[symbol]
+            
+            captured = 0
+            for symbol in symbols:
+                try:
+                    captured += self.capture_ticks(symbol, callback)
+                except Exception as e:
+                    print(f"Tick capture failed for {symbol}: {e}")
+            
+            if captured:
+                interval = max(interval / 2, STREAM_MIN_INTERVAL)
+            else:
+                interval = min(interval * 2, STREAM_MAX_INTERVAL)
+            time.sleep(interval)
+        
+        print("Tick capture stopped")
+    
+    def capture_ticks(self, symbol, callback):
+        """Send the ticks of one symbol that arrived since its cursor"""
+        cursor = self.stream_cursors.get(symbol)
+        if cursor is None:
+            # Start from the current tick
             tick = mt5.symbol_info_tick(symbol)
-            if tick is not None:
-                callback({
-                    'symbol': symbol,
-                    'time': tick.time * 1000,  # Convert to milliseconds
-                    'bid': tick.bid,
-                    'ask': tick.ask,
-                    'last': tick.last,
-                    'volume': tick.volume,
-                })
-            time.sleep(0.1)  # 100ms interval
+            if tick is None:
+                return 0
+            self.stream_cursors[symbol] = (tick.time_msc, 1)
+            callback(self._tick_to_dict(symbol, tick.time_msc, tick.bid, tick.ask, tick.last, tick.volume))
+            return 1
+        
+        last_msc, seen = cursor
+        ticks = mt5.copy_ticks_from(symbol, last_msc // 1000, STREAM_MAX_TICKS, mt5.COPY_TICKS_ALL)
+        if ticks is None or len(ticks) == 0:
+            return 0
+        
+        # The request is second-aligned: skip older ticks and the ones already
+        # sent for the last millisecond (several ticks may share a time_msc)
+        times = ticks['time_msc']
+        start = min(
+            int(np.searchsorted(times, last_msc, side='left')) + seen,
+            int(np.searchsorted(times, last_msc, side='right'))
+        )
+        new = ticks[start:]
+        if len(new) == 0:
+            return 0
+        
+        newest = int(new['time_msc'][-1])
+        at_newest = int(np.count_nonzero(new['time_msc'] == newest))
+        self.stream_cursors[symbol] = (newest, at_newest + seen if newest == last_msc else at_newest)
+        
+        for t in new:
+            callback(self._tick_to_dict(symbol, int(t['time_msc']), float(t['bid']), float(t['ask']), float(t['last']), int(t['volume'])))
+        return len(new)
+    
+    def _tick_to_dict(self, symbol, time_msc, bid, ask, last, volume):
+        return {
+            'symbol': symbol,
+            'time': time_msc,  # milliseconds
+            'bid': bid,
+            'ask': ask,
+            'last': last,
+            'volume': volume,
+        }
+
+class TickForwarder:
+    """
+    Sends ticks to the Go backend from a background thread
+
+    The polling loop only appends to a bounded buffer; the sender thread posts
+    batches of up to TICK_BATCH_SIZE ticks as a JSON array over one keep-alive
+    session, at the latest TICK_FLUSH_INTERVAL after a tick arrived. When the
+    backend cannot keep up the oldest ticks are dropped and counted.
+    """
+    
+    def __init__(self, url, batch_size=TICK_BATCH_SIZE, flush_interval=TICK_FLUSH_INTERVAL, max_buffer=TICK_BUFFER_SIZE):
+        self.url = url
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        
+        self.buffer = deque()
+        self.cond = threading.Condition()
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        
+        self.running = False
+        self.thread = None
+        self.last_error = None
+        self.forwarded = 0
+        self.dropped = 0
+        self.batches = 0
+        self.failed_batches = 0
+    
+    def start(self):
+        """Start the sender thread if it is not running"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='tick-forwarder', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Flush what is buffered and stop the sender thread"""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread is not None:
+            self.thread.join(timeout=TICK_POST_TIMEOUT + 1)
+            self.thread = None
+    
+    def submit(self, tick):
+        """Queue a tick without blocking the caller"""
+        with self.cond:
+            if len(self.buffer) >= self.max_buffer:
+                self.buffer.popleft()
+                self.dropped += 1
+            self.buffer.append(tick)
+            if len(self.buffer) >= self.batch_size:
+                self.cond.notify()
+    
+    def stats(self):
+        return {
+            'running': self.running,
+            'buffered': len(self.buffer),
+            'forwarded': self.forwarded,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'failed_batches': self.failed_batches,
+            'last_error': self.last_error,
+        }
+    
+    def _run(self):
+        while True:
+            with self.cond:
+                if self.running and len(self.buffer) < self.batch_size:
+                    self.cond.wait(self.flush_interval)
+                if not self.buffer:
+                    if not self.running:
+                        return
+                    continue
+                count = min(len(self.buffer), self.batch_size)
+                batch = [self.buffer.popleft() for _ in range(count)]
+            self._post(batch)
+    
+    def _post(self, batch):
+        try:
+            response = self.session.post(self.url, json=batch, timeout=TICK_POST_TIMEOUT)
+            response.raise_for_status()
+            self.forwarded += len(batch)
+            self.batches += 1
+            self.last_error = None
+        except Exception as e:
+            self.failed_batches += 1
+            self.dropped += len(batch)
+            # Report once per outage rather than once per batch
+            if self.last_error is None:
+                print(f"Error sending ticks: {e}")
+            self.last_error = str(e)
+
+class AccountFeed:
+    """
+    Versioned feed of account and position changes
+    
+    One thread snapshots the account and positions every FEED_INTERVAL and
+    diffs positions by ticket against the previous snapshot. Each snapshot
+    that changed anything gets a new version, so clients can ask for the
+    changes since the version they hold and long-poll for the next one.
+    At most FEED_MAX_WAITERS long-polls wait at a time, so they cannot
+    occupy every server thread; beyond that, requests that would wait are
+    turned away so clients back off and retry.
+    """
+    
+    def __init__(self, bridge, interval=FEED_INTERVAL, history=FEED_HISTORY, max_waiters=FEED_MAX_WAITERS):
+        self.bridge = bridge
+        self.interval = interval
+        self.history = deque(maxlen=history)  # (version, changes)
+        self.cond = threading.Condition()
+        self.waiters = threading.BoundedSemaphore(max_waiters)
+        self.version = 0
+        self.account = None
+        self.positions = {}
+        self.thread = None
+        self.running = False
+    
+    def start(self):
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='account-feed', daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        self.running = False
+    
+    @property
+    def ready(self):
+        """Whether the feed is running and holds a snapshot of the account"""
+        return self.running and self.account is not None
+    
+    def snapshot(self):
+        """Current account and positions with their version"""
+        with self.cond:
+            return {
+                'version': self.version,
+                'snapshot': True,
+                'account': self.account,
+                'positions': list(self.positions.values()),
+            }
+    
+    def changes_since(self, since, wait=0):
+        """
+        Changes after version since, waiting up to wait seconds for one
+        
+        Falls back to a full snapshot when since is unknown or older than
+        the retained history. Returns None when the request would wait but
+        FEED_MAX_WAITERS long-polls are already waiting.
+        """
+        with self.cond:
+            if wait > 0 and since == self.version:
+                if not self.waiters.acquire(blocking=False):
+                    return None
+                try:
+                    self.cond.wait_for(lambda: self.version != since, timeout=min(wait, FEED_MAX_WAIT))
+                finally:
+                    self.waiters.release()
+            
+            oldest = self.history[0][0] if self.history else self.version + 1
+            if since > self.version or since < oldest - 1:
+                return self.snapshot()
+            
+            changes = [change for version, batch in self.history if version > since for change in batch]
+            return {'version': self.version, 'snapshot': False, 'changes': changes}
+    
+    def _run(self):
+        while self.running:
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Account feed error: {e}")
+            time.sleep(self.interval)
+    
+    def poll(self):
+        """Take one snapshot and publish what changed"""
+        account = self.bridge.get_account_info()
+        if account is None:
+            # Disconnected: keep the last known state rather than reporting everything closed
+            return
+        positions = {pos['ticket']: pos for pos in self.bridge.get_positions()}
+        
+        changes = []
+        if account != self.account:
+            changes.append({'kind': 'account', 'data': account})
+        for ticket, pos in positions.items():
+            if self.positions.get(ticket) != pos:
+                changes.append({'kind': 'position', 'data': pos})
+        for ticket in self.positions.keys() - positions.keys():
+            changes.append({'kind': 'position_closed', 'ticket': ticket})
+        
+        if not changes:
+            return
+        with self.cond:
+            self.account = account
+            self.positions = positions
+            self.version += 1
+            self.history.append((self.version, changes))
+            self.cond.notify_all()
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        request_metrics.record(f"{request.method} {route}", time.perf_counter() - started)
+    return response
 
 # Global bridge instance
 bridge = MT5Bridge()
+forwarder = TickForwarder(f"{GO_BACKEND_URL}/ticks")
+feed = AccountFeed(bridge)
 
 @app.route('/connect', methods=['POST'])
 def connect():
@@ -179,14 +647,40 @@ def get_symbol(symbol):
         return jsonify({'error': 'Symbol not found'}), 404
     return jsonify(info)
 
+def parse_since(value):
+    """Epoch seconds or an RFC3339 timestamp (UTC if no offset) to epoch seconds"""
+    if value is None or value == '':
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = None
+    if seconds is not None:
+        if not math.isfinite(seconds):
+            raise ValueError(f'Invalid since: {value}')
+        return int(seconds)
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError(f'Invalid since: {value}')
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
 @app.route('/rates', methods=['GET'])
 def get_rates():
     """Get historical rates"""
     symbol = request.args.get('symbol', 'EURUSD')
     timeframe = request.args.get('timeframe', 'M5')
-    count = int(request.args.get('count', 100))
+    try:
+        count = int(request.args.get('count', 100))
+        since = parse_since(request.args.get('since'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if not 0 < count <= RATES_MAX_COUNT:
+        return jsonify({'error': f'count must be between 1 and {RATES_MAX_COUNT}'}), 400
     
-    rates = bridge.get_rates(symbol, timeframe, count)
+    rates = bridge.get_rates(symbol, timeframe, count, since)
     if rates is None:
         return jsonify({'error': 'Failed to get rates'}), 500
     
@@ -195,7 +689,9 @@ def get_rates():
 @app.route('/account', methods=['GET'])
 def get_account():
     """Get account info"""
-    info = bridge.get_account_info()
+    # Served from the feed's snapshot so polling dashboards do not hit the terminal;
+    # until the feed has taken its first snapshot, ask the terminal directly
+    info = feed.account if feed.ready else bridge.get_account_info()
     if info is None:
         return jsonify({'error': 'Failed to get account info'}), 500
     return jsonify(info)
@@ -203,33 +699,60 @@ def get_account():
 @app.route('/positions', methods=['GET'])
 def get_positions():
     """Get open positions"""
-    positions = bridge.get_positions()
+    positions = list(feed.positions.values()) if feed.ready else bridge.get_positions()
     return jsonify(positions)
 
-@app.route('/stream/start', methods=['POST'])
-def start_stream():
-    """Start streaming ticks"""
-    data = request.json
-    symbol = data.get('symbol', 'EURUSD')
+@app.route('/feed', methods=['GET'])
+def get_feed():
+    """Account and position changes since a version; wait=N long-polls for the next change"""
+    try:
+        since = request.args.get('since')
+        wait = float(request.args.get('wait', 0))
+    except ValueError:
+        return jsonify({'error': 'wait must be a number'}), 400
     
-    bridge.streaming = True
+    if since is None:
+        return jsonify(feed.snapshot())
+    try:
+        since = int(since)
+    except ValueError:
+        return jsonify({'error': 'since must be a version number'}), 400
     
-    def send_to_backend(tick_data):
-        try:
-            # Send tick to Go backend
-            requests.post(f"{GO_BACKEND_URL}/tick", json=tick_data, timeout=1)
-        except Exception as e:
-            print(f"Error sending tick: {e}")
+    changes = feed.changes_since(since, wait)
+    if changes is None:
+        return jsonify({'error': 'Too many waiting feed requests'}), 429, {'Retry-After': str(FEED_RETRY_AFTER)}
+    return jsonify(changes)
+
+@app.route('/stream/start', methods=['POST'])
+def start_stream():
+    """Start streaming ticks for one or more symbols"""
+    data = request.json or {}
+    symbols = data.get('symbols') or [data.get('symbol', 'EURUSD')]
     
-    threading.Thread(target=bridge.stream_ticks, args=(symbol, send_to_backend), daemon=True).start()
+    # Ticks are batched and sent to the Go backend off the polling thread
+    forwarder.start()
+    bridge.start_streaming(symbols, forwarder.submit)
     
-    return jsonify({'streaming': True})
+    return jsonify({'streaming': True, 'symbols': sorted(bridge.stream_symbols)})
 
 @app.route('/stream/stop', methods=['POST'])
 def stop_stream():
-    """Stop streaming ticks"""
-    bridge.streaming = False
-    return jsonify({'streaming': False})
+    """Stop streaming ticks for the given symbols, or all of them"""
+    data = request.get_json(silent=True) or {}
+    symbols = data.get('symbols') or ([data['symbol']] if data.get('symbol') else None)
+    
+    bridge.stop_streaming(symbols)
+    return jsonify({'streaming': bridge.streaming, 'symbols': sorted(bridge.stream_symbols)})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Request and terminal call latency"""
+    return jsonify({
+        'requests': request_metrics.summary(),
+        'terminal': terminal_metrics.summary(),
+        'terminal_queue_depth': mt5.queue_depth,
+        'terminal_shared_reads': mt5.shared_reads,
+    })
 
 @app.route('/health', methods=['GET'])
 def health():
@@ -237,12 +760,16 @@ def health():
     return jsonify({
         'status': 'healthy',
         'connected': bridge.connected,
-        'streaming': bridge.streaming
+        'streaming': bridge.streaming,
+        'symbols': sorted(bridge.stream_symbols),
+        'forwarder': forwarder.stats(),
+        'feed_version': feed.version
     })
 
 if __name__ == '__main__':
     # Auto-connect on startup (no credentials required for demo)
     bridge.connect()
+    feed.start()
     
     print("MT5 Bridge Server starting on http://localhost:5000")
     print("Endpoints:")
@@ -251,7 +778,14 @@ if __name__ == '__main__':
     print("  GET  /rates - Get historical rates")
     print("  GET  /account - Get account info")
     print("  GET  /positions - Get positions")
+    print("  GET  /feed - Account and position changes since a version")
     print("  POST /stream/start - Start tick streaming")
+    print("  GET  /metrics - Request and terminal call latency")
     print("")
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    if '--production' in sys.argv or os.environ.get('BRIDGE_ENV') == 'production':
+        from waitress import serve
+        print(f"Serving with waitress ({SERVER_THREADS} threads)")
+        serve(app, host='0.0.0.0', port=5000, threads=SERVER_THREADS, connection_limit=SERVER_CONNECTION_LIMIT)
+    else:
+        app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file